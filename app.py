@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 import os
 os.environ['STREAMLIT_SERVER_MAXSIZE'] = '1'
+pd.set_option('mode.copy_on_write', True)
 
+from config.config import CONFIG
+from core import FileLoader
 from ui import (
     render_header,
     render_operation_controls,
@@ -13,16 +16,31 @@ from utils.general import error_handler
 
 @error_handler
 def handle_file_upload():
-    uploaded_file = st.file_uploader('📁 Upload your CSV file', type=['csv'])
+    uploaded_file = st.file_uploader('📁 Upload your data file', type=CONFIG['data'].SUPPORTED_FILE_TYPES)
     if uploaded_file:
         try:
-            df = pd.read_csv(uploaded_file)
             from version_control.controller import VersionController
             vc = VersionController()
             vc.load_from_session()
+            if (
+                st.session_state.get('uploaded_file_id') == uploaded_file.file_id
+                and uploaded_file.name in vc.get_dataframes()
+            ):
+                return True
+            loader = FileLoader()
+            file_type = loader.file_type(uploaded_file.name)
+            sample = loader.read_preview(uploaded_file, file_type)
+            preview = st.empty()
+            with preview.container():
+                st.caption(f'Loading {uploaded_file.name}, showing the first {len(sample)} rows...')
+                st.dataframe(sample)
+            df = loader.read(uploaded_file, file_type, loader.sniff_types(sample))
+            preview.empty()
+            df = st.session_state['scruffy'].compact(df, 'Initial Load')
             vc.add_uploaded_file(uploaded_file.name, df)
             st.session_state['df'] = df
             st.session_state['uploaded_filename'] = uploaded_file.name
+            st.session_state['uploaded_file_id'] = uploaded_file.file_id
             return True
         except Exception as e:
             st.error(f'Error uploading file: {str(e)}')
@@ -0,0 +1,115 @@
+'''
+Compares the compiled filter plans in core.filters, with and without short-circuit evaluation,
+against the original recursive Vacuum.build_mask, which combined every level of the filter tree
+with pd.concat.
+
+Run from the project root:
+    python benchmarks/filter_plans.py --rows 1000000 --repeat 5
+'''
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import Vacuum
+
+
+class LegacyVacuum(Vacuum):
+    def build_mask(self, df, filters):
+        if isinstance(filters, dict):
+            if any(op in filters for op in ['OR', 'XOR', 'AND']):
+                for logical_op in ['OR', 'XOR', 'AND']:
+                    if logical_op in filters:
+                        conditions = filters[logical_op]
+                        if isinstance(conditions, list):
+                            masks = [self.build_mask(df, condition) for condition in conditions]
+                        elif isinstance(conditions, dict):
+                            masks = [self.build_mask(df, conditions)]
+                        else:
+                            raise ValueError(f'Invalid format for {logical_op} conditions: {conditions}')
+                        if logical_op == 'OR':
+                            return pd.concat(masks, axis=1).any(axis=1)
+                        elif logical_op == 'XOR':
+                            sum_masks = pd.concat(masks, axis=1).sum(axis=1)
+                            return sum_masks == 1
+                        elif logical_op == 'AND':
+                            return pd.concat(masks, axis=1).all(axis=1)
+            else:
+                masks = []
+                for key, condition in filters.items():
+                    if key in ['OR', 'XOR', 'AND']:
+                        masks.append(self.build_mask(df, {key: condition}))
+                    elif isinstance(condition, dict) and 'op' in condition:
+                        masks.append(self.apply_filter(df, key, condition))
+                    else:
+                        masks.append(self.build_mask(df, condition))
+                return pd.concat(masks, axis=1).all(axis=1)
+        else:
+            raise ValueError(f'Invalid filter format: {filters}')
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'amount': rng.normal(100, 25, rows),
+        'quantity': rng.integers(0, 50, rows),
+        'region': rng.choice(['north', 'south', 'east', 'west'], rows),
+        'status': rng.choice(['open', 'closed', 'pending', None], rows),
+        'priority': rng.integers(1, 6, rows),
+    })
+
+
+def nested_filters(depth):
+    leaves = [
+        {'amount': {'op': '>', 'value': 90}},
+        {'quantity': {'op': 'between', 'value': [5, 40]}},
+        {'region': {'op': 'in', 'value': ['north', 'east']}},
+        {'status': {'op': 'notna'}},
+        {'priority': {'op': '>=', 'value': 3}},
+        {'status': {'op': 'contains', 'value': 'pen'}},
+    ]
+    node = {'AND': leaves[:2]}
+    for level in range(depth):
+        logical_op = ['OR', 'AND', 'XOR'][level % 3]
+        node = {logical_op: [node, leaves[(level + 2) % len(leaves)], leaves[(level + 3) % len(leaves)]]}
+    return node
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 3, 6, 9])
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    legacy = LegacyVacuum()
+    compiled, short_circuit = Vacuum(short_circuit=False), Vacuum(short_circuit=True)
+    print(f'{"depth":>5} {"legacy (s)":>12} {"compiled (s)":>13} {"short-circuit (s)":>18} {"best speedup":>13}')
+    for depth in args.depths:
+        filters = nested_filters(depth)
+        expected = legacy.build_mask(df, filters)
+        assert expected.equals(compiled.build_mask(df, filters))
+        assert expected.equals(short_circuit.build_mask(df, filters))
+        legacy_time = best_of(lambda: legacy.build_mask(df, filters), args.repeat)
+        compiled_time = best_of(lambda: compiled.build_mask(df, filters), args.repeat)
+        short_circuit_time = best_of(lambda: short_circuit.build_mask(df, filters), args.repeat)
+        speedup = legacy_time / min(compiled_time, short_circuit_time)
+        print(f'{depth:>5} {legacy_time:>12.4f} {compiled_time:>13.4f} {short_circuit_time:>18.4f} {speedup:>12.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+'''
+Local stand-in for an OpenAI-compatible chat completions endpoint, for trying the LLM client's
+streaming, retries and caching without an API key. Every request is answered with the commands
+in --response, streamed as server-sent events when the request sets "stream": true.
+
+Run from the project root, then set API_URI under [LLM] in config/config.ini to the printed URL:
+    python benchmarks/mock_llm_server.py --port 8765 --token-delay 0.01 --fail-first 2
+'''
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(content, token_chars, token_delay, latency, fail_first):
+    request_ids = itertools.count()
+    lock = threading.Lock()
+
+    class MockLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            with lock:
+                request_id = next(request_ids)
+            if request_id < fail_first:
+                return self._send_json(503, {'error': 'overloaded'}, {'Retry-After': '0'})
+            time.sleep(latency)
+            if payload.get('stream'):
+                return self._stream(payload)
+            self._send_json(200, {
+                'id': f'mock-{request_id}',
+                'object': 'chat.completion',
+                'model': payload.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            })
+
+        def _stream(self, payload):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(content), token_chars):
+                chunk = {
+                    'object': 'chat.completion.chunk',
+                    'model': payload.get('model'),
+                    'choices': [{'index': 0, 'delta': {'content': content[start:start + token_chars]}}],
+                }
+                self._write_chunk(f'data: {json.dumps(chunk)}\n\n')
+                time.sleep(token_delay)
+            self._write_chunk('data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _write_chunk(self, text):
+            data = text.encode()
+            self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+            self.wfile.flush()
+
+        def _send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockLLMHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--response', default='data/commands/example/and_operations.json')
+    parser.add_argument('--token-chars', type=int, default=4, help='characters per streamed chunk')
+    parser.add_argument('--token-delay', type=float, default=0.01, help='seconds between streamed chunks')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before the first byte')
+    parser.add_argument('--fail-first', type=int, default=0, help='answer the first N requests with 503')
+    args = parser.parse_args()
+
+    with open(args.response, 'r') as f:
+        content = json.dumps(json.load(f), indent=4)
+    handler = make_handler(content, args.token_chars, args.token_delay, args.latency, args.fail_first)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f'Mock LLM server on http://{args.host}:{args.port}/v1/chat/completions')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
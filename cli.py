@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from config.config import CONFIG
+
+
+def load_commands(command_path):
+    with open(command_path, 'r') as f:
+        commands = json.load(f)
+    return commands if isinstance(commands, list) else [commands]
+
+
+def get_output_dirs(output_dir, input_paths):
+    '''
+    Output directory of each input. A single input writes to output_dir itself; several inputs
+    each get a subdirectory named after the file, suffixed with _2, _3, ... when names collide.
+    '''
+    if len(input_paths) == 1:
+        return {input_paths[0]: output_dir}
+    output_dirs = {}
+    used = set()
+    for input_path in input_paths:
+        base_name = name = os.path.basename(input_path).rsplit('.', 1)[0]
+        suffix = 1
+        while name in used:
+            suffix += 1
+            name = f'{base_name}_{suffix}'
+        used.add(name)
+        output_dirs[input_path] = os.path.join(output_dir, name)
+    return output_dirs
+
+
+def find_duplicate_inputs(input_paths):
+    seen = set()
+    duplicates = []
+    for input_path in input_paths:
+        real_path = os.path.realpath(input_path)
+        if real_path in seen:
+            duplicates.append(input_path)
+        seen.add(real_path)
+    return duplicates
+
+
+def run_file(input_path, commands, output_dir, stream=False, chunksize=None, parallel=None):
+    from core import Broom, Vacuum
+    os.makedirs(output_dir, exist_ok=True)
+    broom = Broom(parallel=parallel)
+    vacuum = Vacuum()
+    row_counts = {}
+    if stream:
+        from core import ChunkedRunner
+        runner = ChunkedRunner(broom=broom, vacuum=vacuum, chunksize=chunksize)
+        for command in commands:
+            filename = command.get('filename', 'unnamed_command.csv')
+            row_counts[filename] = runner.run_command(input_path, command, os.path.join(output_dir, filename))
+        return row_counts
+    df = pd.read_csv(input_path)
+    for command in commands:
+        filename = command.get('filename', 'unnamed_command.csv')
+        result_df = df
+        if command.get('filters'):
+            result_df = vacuum.apply_command(result_df, command)
+        if command.get('scruff'):
+            result_df = broom.scruff(result_df, options=command['scruff'])
+        result_df.to_csv(os.path.join(output_dir, filename), index=False)
+        row_counts[filename] = len(result_df)
+    return row_counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run saved Scruffy command JSON files against one or more input files without the UI.'
+    )
+    parser.add_argument('inputs', nargs='+', help='Input CSV files.')
+    parser.add_argument('-c', '--commands', required=True, help='Command JSON file (a single command or a list).')
+    parser.add_argument('-o', '--output-dir', default='data/output_dfs', help='Directory for the output files.')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Number of input files processed in parallel worker processes.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Process each input in chunks instead of loading it into memory.')
+    parser.add_argument('--chunksize', type=int, default=CONFIG['streaming'].CHUNK_ROWS,
+                        help='Rows per chunk in streaming mode.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    duplicates = find_duplicate_inputs(args.inputs)
+    if duplicates:
+        print(f'Error: input files given more than once: {", ".join(duplicates)}', file=sys.stderr)
+        return 2
+    commands = load_commands(args.commands)
+    multiple_inputs = len(args.inputs) > 1
+    jobs = get_output_dirs(args.output_dir, args.inputs)
+    failures = 0
+
+    def report(input_path, row_counts):
+        for filename, row_count in row_counts.items():
+            print(f'{input_path} -> {os.path.join(jobs[input_path], filename)}: {row_count} rows')
+
+    if args.workers > 1 and multiple_inputs:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(run_file, input_path, commands, output_dir, args.stream, args.chunksize, False): input_path
+                for input_path, output_dir in jobs.items()
+            }
+            for future in as_completed(futures):
+                input_path = futures[future]
+                try:
+                    report(input_path, future.result())
+                except Exception as e:
+                    failures += 1
+                    print(f'Error processing {input_path}: {type(e).__name__}: {e}', file=sys.stderr)
+    else:
+        for input_path, output_dir in jobs.items():
+            try:
+                report(input_path, run_file(input_path, commands, output_dir, args.stream, args.chunksize))
+            except Exception as e:
+                failures += 1
+                print(f'Error processing {input_path}: {type(e).__name__}: {e}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
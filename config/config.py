@@ -1,8 +1,9 @@
 import configparser
+import os
 from typing import Dict, List
 
 config = configparser.ConfigParser()
-config.read('config/config.ini')
+config.read(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
 
 class UIConfig:
     TABS: Dict[str, str] = {
@@ -72,11 +73,24 @@ class ErrorMessages:
     VALIDATION_ERROR: str = config.get('ERRORS', 'VALIDATION_ERROR')
 
 class LLMConfig:
+    BACKEND: str = config.get('LLM', 'BACKEND')
     MODEL_ID: str = config.get('LLM', 'MODEL_ID')
     API_URI: str = config.get('LLM', 'API_URI')
     MAX_TOKENS: int = config.getint('LLM', 'MAX_TOKENS')
     TEMPERATURE: float = config.getfloat('LLM', 'TEMPERATURE')
     TOP_P: float = config.getfloat('LLM', 'TOP_P')
+    STREAM: bool = config.getboolean('LLM', 'STREAM')
+    TIMEOUT: float = config.getfloat('LLM', 'TIMEOUT')
+    CONNECT_TIMEOUT: float = config.getfloat('LLM', 'CONNECT_TIMEOUT')
+    RETRIES: int = config.getint('LLM', 'RETRIES')
+    BACKOFF: float = config.getfloat('LLM', 'BACKOFF')
+    POOL_SIZE: int = config.getint('LLM', 'POOL_SIZE')
+    CONCURRENCY: int = config.getint('LLM', 'CONCURRENCY')
+    BATCH_TIMEOUT: float = config.getfloat('LLM', 'BATCH_TIMEOUT')
+
+class LlamaCppConfig:
+    API_URI: str = config.get('LLAMACPP', 'API_URI')
+    MODEL_ID: str = config.get('LLAMACPP', 'MODEL_ID')
 
 class ScruffDefaults:
     COLUMN_OPTIONS: Dict[str, bool] = {
@@ -95,7 +109,10 @@ class ScruffDefaults:
         'fill_numeric_na': config.getboolean('SCRUFF', 'FILL_NUMERIC_NA')
     }
     Z_SCORE_THRESHOLD: float = config.getfloat('SCRUFF', 'Z_SCORE_THRESHOLD')
+    OUTLIER_METHOD: str = config.get('SCRUFF', 'OUTLIER_METHOD')
+    IQR_MULTIPLIER: float = config.getfloat('SCRUFF', 'IQR_MULTIPLIER')
     FILL_METHOD: str = config.get('SCRUFF', 'FILL_METHOD')
+    NUMERIC_ENGINE: str = config.get('SCRUFF', 'NUMERIC_ENGINE')
     NUMERIC_CONVERSION: str = config.get('SCRUFF', 'NUMERIC_CONVERSION')
     TEXT_OPTIONS: Dict[str, bool] = {
         'clean_text': config.getboolean('SCRUFF', 'CLEAN_TEXT'),
@@ -106,10 +123,63 @@ class ScruffDefaults:
         'lemmatize': config.getboolean('SCRUFF', 'LEMMATIZE')
     }
 
+class FilterConfig:
+    SHORT_CIRCUIT: bool = config.getboolean('FILTERS', 'SHORT_CIRCUIT')
+
+class ParallelConfig:
+    ENABLED: bool = config.getboolean('PARALLEL', 'ENABLED')
+    WORKERS: int = config.getint('PARALLEL', 'WORKERS')
+    CHUNK_ROWS: int = config.getint('PARALLEL', 'CHUNK_ROWS')
+
+class StreamingConfig:
+    CHUNK_ROWS: int = config.getint('STREAMING', 'CHUNK_ROWS')
+
+class VersionsConfig:
+    MAX_RESIDENT: int = config.getint('VERSIONS', 'MAX_RESIDENT')
+    SPILL_DIR: str = config.get('VERSIONS', 'SPILL_DIR')
+    CHECKPOINT_EVERY: int = config.getint('VERSIONS', 'CHECKPOINT_EVERY')
+
+class CacheConfig:
+    MAX_MB: int = config.getint('CACHE', 'MAX_MB')
+    PERSIST: bool = config.getboolean('CACHE', 'PERSIST')
+    DIRECTORY: str = config.get('CACHE', 'DIRECTORY')
+    MAX_DISK_MB: int = config.getint('CACHE', 'MAX_DISK_MB')
+
+class IngestConfig:
+    ENGINE: str = config.get('INGEST', 'ENGINE')
+    PREVIEW_ROWS: int = config.getint('INGEST', 'PREVIEW_ROWS')
+    SNIFF_TYPES: bool = config.getboolean('INGEST', 'SNIFF_TYPES')
+
+class ExportConfig:
+    CHUNK_ROWS: int = config.getint('EXPORT', 'CHUNK_ROWS')
+    DIRECTORY: str = config.get('EXPORT', 'DIRECTORY')
+    DEFAULT_FORMAT: str = config.get('EXPORT', 'DEFAULT_FORMAT')
+
+class MemoryConfig:
+    COMPACT: bool = config.getboolean('MEMORY', 'COMPACT')
+    CATEGORY_RATIO: float = config.getfloat('MEMORY', 'CATEGORY_RATIO')
+    ARROW_STRINGS: bool = config.getboolean('MEMORY', 'ARROW_STRINGS')
+
+class LLMCacheConfig:
+    ENABLED: bool = config.getboolean('LLM_CACHE', 'ENABLED')
+    PATH: str = config.get('LLM_CACHE', 'PATH')
+    TTL_HOURS: float = config.getfloat('LLM_CACHE', 'TTL_HOURS')
+    MAX_MB: int = config.getint('LLM_CACHE', 'MAX_MB')
+
 CONFIG = {
     'ui': UIConfig(),
     'data': DataConfig(),
     'errors': ErrorMessages(),
     'llm': LLMConfig(),
-    'scruff': ScruffDefaults()
+    'llamacpp': LlamaCppConfig(),
+    'scruff': ScruffDefaults(),
+    'filters': FilterConfig(),
+    'parallel': ParallelConfig(),
+    'streaming': StreamingConfig(),
+    'versions': VersionsConfig(),
+    'cache': CacheConfig(),
+    'ingest': IngestConfig(),
+    'export': ExportConfig(),
+    'memory': MemoryConfig(),
+    'llm_cache': LLMCacheConfig()
 }
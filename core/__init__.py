@@ -0,0 +1,42 @@
+from .broom import (
+    Broom,
+)
+
+from .vacuum import (
+    Vacuum,
+)
+
+from .streaming import (
+    ChunkedRunner,
+)
+
+from .batch import (
+    BatchPlanner,
+)
+
+from .cache import (
+    ResultCache,
+)
+
+from .ingest import (
+    FileLoader,
+)
+
+from .export import (
+    Exporter,
+)
+
+from .compaction import (
+    compact_frame,
+)
+
+__all__ = [
+    'Broom',
+    'Vacuum',
+    'ChunkedRunner',
+    'BatchPlanner',
+    'ResultCache',
+    'FileLoader',
+    'Exporter',
+    'compact_frame',
+]
@@ -0,0 +1,52 @@
+import json
+from collections import OrderedDict
+
+
+class BatchPlanner:
+    '''
+    Runs a batch of commands against one DataFrame.
+
+    Commands are grouped by their scruff options, so each distinct set of options is scruffed
+    once and the scruffed frame is shared by every command in the group. Within a group, filter
+    subtrees that appear in several commands are evaluated once and their masks reused. Groups
+    are processed one at a time, so only one scruffed frame is held besides the outputs.
+    '''
+    def __init__(self, broom, vacuum):
+        self.broom = broom
+        self.vacuum = vacuum
+
+    @staticmethod
+    def _scruff_key(options):
+        return json.dumps(options or None, sort_keys=True, default=repr)
+
+    def plan(self, commands):
+        groups = OrderedDict()
+        for index, command in enumerate(commands):
+            groups.setdefault(self._scruff_key(command.get('scruff')), []).append(index)
+        return groups
+
+    def execute(self, df, commands, version=None):
+        '''
+        Returns one entry per command, in order: the resulting DataFrame, or the exception raised
+        while applying that command's filters.
+        '''
+        results = [None] * len(commands)
+        for indices in self.plan(commands).values():
+            scruff_options = commands[indices[0]].get('scruff')
+            scruffed_df = self.broom.scruff(df, options=scruff_options) if scruff_options else df
+            masks = {}
+            for index in indices:
+                command = commands[index]
+                if not command.get('filters'):
+                    results[index] = scruffed_df
+                    continue
+                try:
+                    results[index] = self.vacuum.apply_command(
+                        scruffed_df,
+                        command,
+                        version=None if scruff_options else version,
+                        masks=masks
+                    )
+                except Exception as e:
+                    results[index] = e
+        return results
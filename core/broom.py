@@ -0,0 +1,429 @@
+import logging
+import os
+import unicodedata
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from config.config import CONFIG
+from core.stats import robust_bounds
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenMap(dict):
+    def __init__(self, transform):
+        super().__init__()
+        self._transform = transform
+
+    def __missing__(self, word):
+        value = self[word] = self._transform(word)
+        return value
+
+
+class Broom:
+    MATRIX_BLOCK_ROWS = 65536
+
+    def __init__(self, parallel=None, workers=None, chunk_rows=None, warn=None, numeric_engine=None):
+        self.warn = warn or logger.warning
+        self.numeric_engine = numeric_engine or CONFIG['scruff'].NUMERIC_ENGINE
+        self._stop_words = None
+        self._lemmatizer = None
+        self._token_maps = {}
+        self.parallel = CONFIG['parallel'].ENABLED if parallel is None else parallel
+        self.workers = workers or CONFIG['parallel'].WORKERS or os.cpu_count()
+        self.chunk_rows = chunk_rows or CONFIG['parallel'].CHUNK_ROWS
+        self._executor = None
+
+    def _initialize_nltk(self):
+        import nltk
+        try:
+            nltk.data.find('corpora/stopwords')
+            nltk.data.find('corpora/wordnet')
+        except LookupError:
+            nltk.download('stopwords')
+            nltk.download('wordnet')
+
+    def _get_stop_words(self):
+        if self._stop_words is None:
+            self._initialize_nltk()
+            from nltk.corpus import stopwords
+            self._stop_words = frozenset(stopwords.words('english'))
+        return self._stop_words
+
+    def _get_lemmatizer(self):
+        if self._lemmatizer is None:
+            self._initialize_nltk()
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer
+
+    def _get_token_map(self, remove_stopwords, lemmatize):
+        key = (remove_stopwords, lemmatize)
+        if key not in self._token_maps:
+            stop_words = self._get_stop_words() if remove_stopwords else frozenset()
+            lemmatizer = self._get_lemmatizer() if lemmatize else None
+
+            def transform(word):
+                if word in stop_words:
+                    return ''
+                return lemmatizer.lemmatize(word) if lemmatizer else word
+            self._token_maps[key] = _TokenMap(transform)
+        return self._token_maps[key]
+
+    @staticmethod
+    def _is_monetary(series):
+        if series.dtype == object:
+            pattern = r'^\s*[$£€¥]\s*\d+\.?\d*|\d+\.?\d*\s*[$£€¥]\s*$'
+            return series.str.match(pattern, na=False).any()
+        return False
+
+    @staticmethod
+    def _clean_monetary(series):
+        if series.dtype == object:
+            cleaned = series.replace(r'[$£€¥,]', '', regex=True)
+            return pd.to_numeric(cleaned, errors='coerce')
+        return series
+
+    @staticmethod
+    def _normalize_numeric(series):
+        if not pd.isna(series.std()) and series.std() == 0:
+            return series
+        if pd.api.types.is_integer_dtype(series.dtype):
+            series = series.astype('float64' if isinstance(series.dtype, np.dtype) else 'Float64')
+        return (series - series.min()) / (series.max() - series.min())
+
+    def _standardize_column_names(self, df):
+        def to_snake_case(name):
+            name = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in str(name))
+            return '_'.join(name.lower().split())
+        df.columns = [to_snake_case(col) for col in df.columns]
+        return df
+
+    def _convert_numeric_types(self, df, conversion_options):
+        df_copy = df.copy()
+        for column, target_type in conversion_options.items():
+            try:
+                if target_type == 'int':
+                    df_copy[column] = df_copy[column].astype('int64')
+                elif target_type == 'float':
+                    df_copy[column] = df_copy[column].astype('float64')
+                elif target_type == 'string':
+                    df_copy[column] = df_copy[column].astype(str)
+            except Exception as e:
+                self.warn(f'Could not convert {column} to {target_type}: {str(e)}')
+        return df_copy
+
+    def _clean_text(self, text, remove_accents=True, to_lowercase=True,
+                    remove_special_chars=True, remove_stopwords=True, lemmatize=True):
+        if pd.isna(text) or not isinstance(text, str):
+            return ''
+        if remove_accents:
+            text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+        if to_lowercase:
+            text = text.lower()
+        if remove_special_chars:
+            text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+        words = text.split()
+        if remove_stopwords:
+            stop_words = self._get_stop_words()
+            words = [word for word in words if word not in stop_words]
+        if lemmatize:
+            lemmatizer = self._get_lemmatizer()
+            words = [lemmatizer.lemmatize(word) for word in words]
+        return ' '.join(words)
+
+    def _clean_text_series(self, series, remove_accents=True, to_lowercase=True,
+                           remove_special_chars=True, remove_stopwords=True, lemmatize=True):
+        is_text = series.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        text = series[is_text]
+        if remove_accents:
+            text = text.str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('ascii')
+        if to_lowercase:
+            text = text.str.lower()
+        if remove_special_chars:
+            text = text.str.replace(r'[^a-zA-Z0-9\s]', '', regex=True)
+        if remove_stopwords or lemmatize:
+            token_map = self._get_token_map(remove_stopwords, lemmatize)
+            cleaned_text = [' '.join(filter(None, map(token_map.__getitem__, value.split()))) for value in text]
+        else:
+            cleaned_text = text.str.replace(r'\s+', ' ', regex=True).str.strip().to_numpy()
+        values = np.full(len(series), '', dtype=object)
+        values[is_text] = cleaned_text
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def _handle_column_operations(self, df, options):
+        if options.get('standardize_columns'):
+            df = self._standardize_column_names(df)
+        if options.get('drop_empty_columns'):
+            df = df.dropna(axis=1, how='all')
+        if options.get('drop_duplicate_columns'):
+            df = df.loc[:, ~df.columns.duplicated()]
+        return df
+
+    def _handle_row_operations(self, df, options):
+        if options.get('drop_na_rows'):
+            df = df.dropna(how='any')
+        elif options.get('drop_na_threshold') is not None:
+            threshold = options['drop_na_threshold'] / 100
+            df = df.loc[df.isna().mean(axis=1) <= threshold]
+        if options.get('drop_duplicate_rows'):
+            df = df.drop_duplicates()
+        return df
+
+    def _fill_and_normalize(self, series, options):
+        if options.get('fill_numeric_na'):
+            fill_method = options.get('fill_method', 'mean')
+            if fill_method == 'mean':
+                series = series.fillna(series.mean())
+            elif fill_method == 'median':
+                series = series.fillna(series.median())
+            elif fill_method == 'zero':
+                series = series.fillna(0)
+            elif fill_method == 'forward':
+                series = series.ffill()
+            elif fill_method == 'backward':
+                series = series.bfill()
+        if options.get('normalize_numeric'):
+            series = self._normalize_numeric(series)
+        return series
+
+    @staticmethod
+    def _outlier_bounds(options, q1, median, q3, mad):
+        '''Bounds of the iqr and mad outlier methods. Rows with NaN in a column are never its outliers.'''
+        return robust_bounds(
+            options.get('outlier_method'), q1, median, q3, mad,
+            options.get('z_score_threshold', 3.0), options.get('iqr_multiplier', 1.5)
+        )
+
+    def _handle_numeric_operations(self, df, options):
+        if options.get('normalize_numeric') or options.get('handle_outliers') or options.get('fill_numeric_na'):
+            numeric_columns = df.select_dtypes(include=[np.number]).columns
+            if options.get('numeric_engine', self.numeric_engine) == 'matrix':
+                df = self._numeric_matrix(df, options)
+            elif self._executor is not None and not options.get('handle_outliers') and len(numeric_columns) > 1:
+                batches = [batch for batch in np.array_split(numeric_columns, self.workers) if len(batch)]
+                futures = [self._executor.submit(_numeric_task, df[batch], options) for batch in batches]
+                for future in futures:
+                    result = future.result()
+                    for column in result.columns:
+                        df[column] = result[column]
+            else:
+                for column in numeric_columns:
+                    if options.get('handle_outliers') and options.get('outlier_method', 'zscore') == 'zscore':
+                        z_threshold = options.get('z_score_threshold', 3.0)
+                        z_scores = np.abs((df[column] - df[column].mean()) / df[column].std())
+                        df = df[z_scores < z_threshold]
+                    elif options.get('handle_outliers'):
+                        series = df[column]
+                        q1, median, q3 = series.quantile([0.25, 0.5, 0.75])
+                        low, high = self._outlier_bounds(options, q1, median, q3, (series - median).abs().median())
+                        df = df[series.between(low, high) | series.isna()]
+                    df[column] = self._fill_and_normalize(df[column], options)
+        if options.get('numeric_conversion') and options['numeric_conversion'] != 'None':
+            conversion = options['numeric_conversion']
+            numeric_columns = df.select_dtypes(include=[np.number]).columns
+            if conversion == 'Int to Float':
+                df[numeric_columns] = df[numeric_columns].astype(float)
+            elif conversion == 'Float to Int':
+                df[numeric_columns] = df[numeric_columns].astype(int)
+            elif conversion == 'Numeric to String':
+                df[numeric_columns] = df[numeric_columns].astype(str)
+        return df
+
+    def _numeric_matrix(self, df, options):
+        '''
+        Outlier removal, fill and normalization over all numeric columns at once, on one float64
+        matrix. Statistics are computed with one NumPy reduction per statistic across all columns,
+        and outliers are removed with one mask combined from every column's z-scores on the
+        unfiltered rows, as ChunkedRunner does. The sequential engine instead filters column by
+        column, so later columns see statistics of rows already filtered by earlier ones.
+        Results otherwise match it up to floating-point rounding. The matrix runs in the calling
+        process and does not use the parallel executor, so it is used only when asked for.
+        '''
+        numeric_dtypes = set(df.select_dtypes(include=[np.number]).dtypes)
+        positions = [position for position, dtype in enumerate(df.dtypes) if dtype in numeric_dtypes]
+        if not positions:
+            return df
+        values = np.asfortranarray(df.iloc[:, positions].to_numpy(dtype='float64', na_value=np.nan))
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if options.get('handle_outliers'):
+                if options.get('outlier_method', 'zscore') == 'zscore':
+                    z_threshold = options.get('z_score_threshold', 3.0)
+                    mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0, ddof=1)
+
+                    def inliers(block):
+                        return np.abs((block - mean) / std) < z_threshold
+                else:
+                    q1, median, q3 = np.nanpercentile(values, [25, 50, 75], axis=0)
+                    low, high = self._outlier_bounds(options, q1, median, q3, np.nanmedian(np.abs(values - median), axis=0))
+
+                    def inliers(block):
+                        return (block >= low) & (block <= high) | np.isnan(block)
+                keep = np.empty(len(values), dtype=bool)
+                for start in range(0, len(values), self.MATRIX_BLOCK_ROWS):
+                    keep[start:start + self.MATRIX_BLOCK_ROWS] = inliers(values[start:start + self.MATRIX_BLOCK_ROWS]).all(axis=1)
+                df, values = df[keep], values[keep]
+            changed = np.zeros(len(positions), dtype=bool)
+            if options.get('fill_numeric_na'):
+                missing = np.isnan(values)
+                changed |= missing.any(axis=0)
+                fill_method = options.get('fill_method', 'mean')
+                if fill_method in ('mean', 'median', 'zero'):
+                    fill_values = (
+                        np.nanmean(values, axis=0) if fill_method == 'mean'
+                        else np.nanmedian(values, axis=0) if fill_method == 'median'
+                        else np.zeros(len(positions))
+                    )
+                    np.copyto(values, fill_values, where=missing)
+                elif fill_method in ('forward', 'backward'):
+                    block = pd.DataFrame(values)
+                    values = np.asfortranarray((block.ffill() if fill_method == 'forward' else block.bfill()).to_numpy())
+            if options.get('normalize_numeric'):
+                present = ~np.isnan(values)
+                low = np.min(values, axis=0, initial=np.inf, where=present)
+                high = np.max(values, axis=0, initial=-np.inf, where=present)
+                constant = (low == high) & (present.sum(axis=0) > 1)
+                scale = np.where(constant, 1.0, high - low)
+                offset = np.where(constant, 0.0, low)
+                values = (values - offset) / scale
+                changed |= ~constant
+        for column, position in enumerate(positions):
+            dtype = df.dtypes.iloc[position]
+            if not isinstance(dtype, np.dtype):
+                df.isetitem(position, self._fill_and_normalize(df.iloc[:, position], options))
+            elif changed[column]:
+                series_values = values[:, column]
+                if dtype.kind == 'f':
+                    series_values = series_values.astype(dtype, copy=False)
+                df.isetitem(position, pd.Series(series_values, index=df.index))
+        return df
+
+    def _clean_text_column(self, series, text_options):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = pd.Series(series.cat.categories.to_numpy(dtype=object), dtype=object)
+            cleaned = self._clean_text_series(categories, **text_options).to_numpy()
+            codes = series.cat.codes.to_numpy()
+            if (codes == -1).any():
+                cleaned = np.append(cleaned, '')
+            category_codes, new_categories = pd.factorize(cleaned)
+            return pd.Series(
+                pd.Categorical.from_codes(
+                    category_codes[codes],
+                    categories=new_categories,
+                    ordered=series.cat.ordered
+                ),
+                index=series.index,
+                name=series.name
+            )
+        codes, uniques = pd.factorize(series)
+        cleaned = self._clean_text_series(pd.Series(uniques, dtype=object), **text_options).to_numpy()
+        if (codes == -1).any():
+            cleaned = np.append(cleaned, '')
+        return pd.Series(cleaned[codes], index=series.index, name=series.name)
+
+    def _handle_text_operations(self, df, options):
+        text_options = {
+            'remove_accents': options.get('remove_accents', False),
+            'to_lowercase': options.get('to_lowercase', False),
+            'remove_special_chars': options.get('remove_special_chars', False),
+            'remove_stopwords': options.get('remove_stopwords', False),
+            'lemmatize': options.get('lemmatize', False)
+        }
+        text_columns = [
+            column for column in df.select_dtypes(include=[object, 'category', 'string']).columns
+            if not isinstance(df[column].dtype, pd.CategoricalDtype) or df[column].cat.categories.dtype == object
+        ]
+        if self._executor is None:
+            for column in text_columns:
+                df[column] = self._clean_text_column(df[column], text_options)
+            return df
+        futures = {}
+        for column in text_columns:
+            series = df[column]
+            if series.dtype != object:
+                df[column] = self._clean_text_column(series, text_options)
+                continue
+            chunks = [series.iloc[start:start + self.chunk_rows] for start in range(0, len(series), self.chunk_rows)]
+            futures[column] = [
+                self._executor.submit(_clean_text_task, chunk, text_options) for chunk in chunks or [series]
+            ]
+        for column, column_futures in futures.items():
+            df[column] = pd.concat([future.result() for future in column_futures])
+        return df
+
+    @staticmethod
+    def _as_values(series):
+        '''Categoricals as plain object columns, so replacements behave as they do on text columns.'''
+        return series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series
+
+    def _handle_value_replacement(self, df, options):
+        if options.get('replace_values'):
+            replacements = options['replace_values']
+            for column, value_map in replacements.items():
+                if column in df.columns:
+                    df[column] = self._as_values(df[column]).replace(value_map)
+
+        if options.get('replace_all_values'):
+            value_map = options['replace_all_values']
+            for position, dtype in enumerate(df.dtypes):
+                if isinstance(dtype, pd.CategoricalDtype):
+                    df.isetitem(position, self._as_values(df.iloc[:, position]))
+            df = df.replace(value_map)
+
+        return df
+
+    @contextmanager
+    def _process_pool(self):
+        if not self.parallel or self.workers < 2:
+            yield
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            self._executor = executor
+            try:
+                yield
+            finally:
+                self._executor = None
+
+    def scruff(self, df_to_clean, options=None):
+        excluded_columns = options.get('excluded_columns', []) if options else []
+        columns_to_process = [col for col in df_to_clean.columns if col not in excluded_columns]
+
+        df_to_clean_excluded = df_to_clean[excluded_columns].copy(deep=False) if excluded_columns else pd.DataFrame()
+        df_to_clean_processed = df_to_clean[columns_to_process].copy(deep=False)
+
+        with self._process_pool():
+            cleaned_df_processed = (
+                df_to_clean_processed
+                .pipe(lambda x: self._handle_column_operations(x, options))
+                .pipe(lambda x: self._handle_row_operations(x, options))
+                .pipe(lambda x: self._handle_numeric_operations(x, options))
+                .pipe(lambda x: self._handle_text_operations(x, options))
+                .pipe(lambda x: self._handle_value_replacement(x, options))
+            )
+
+        cleaned_df = pd.concat([cleaned_df_processed, df_to_clean_excluded], axis=1)
+        return cleaned_df
+
+_worker_broom = None
+
+
+def _get_worker_broom():
+    global _worker_broom
+    if _worker_broom is None:
+        _worker_broom = Broom(parallel=False)
+    return _worker_broom
+
+
+def _clean_text_task(series, text_options):
+    return _get_worker_broom()._clean_text_column(series, text_options)
+
+
+def _numeric_task(df, options):
+    broom = _get_worker_broom()
+    for column in df.columns:
+        df[column] = broom._fill_and_normalize(df[column], options)
+    return df
@@ -0,0 +1,117 @@
+import os
+from collections import OrderedDict
+import pandas as pd
+from config.config import CONFIG
+
+
+PYTHON_STRINGS_KEY = b'scruffy.python_strings'
+
+
+def write_arrow(df, path):
+    '''Writes df with its index to an Arrow IPC file. Returns False if Arrow cannot represent it.'''
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    python_strings = [
+        position for position, dtype in enumerate(df.dtypes)
+        if isinstance(dtype, pd.StringDtype) and dtype.storage == 'python'
+    ]
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        if python_strings:
+            table = table.replace_schema_metadata({
+                **table.schema.metadata, PYTHON_STRINGS_KEY: ','.join(map(str, python_strings)).encode()
+            })
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    except (pa.ArrowException, TypeError, ValueError):
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    return True
+
+
+def read_arrow(path):
+    '''Reads a frame written by write_arrow. String-dtype columns keep their Python or Arrow storage.'''
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    with pd.option_context('mode.string_storage', 'pyarrow'):
+        df = table.to_pandas(split_blocks=True)
+    python_strings = (table.schema.metadata or {}).get(PYTHON_STRINGS_KEY)
+    if python_strings:
+        for position in map(int, python_strings.decode().split(',')):
+            df.isetitem(position, df.iloc[:, position].astype('string[python]'))
+    return df
+
+
+class ResultCache:
+    '''
+    Size-bounded LRU of command results keyed by input fingerprint and command hash.
+
+    With a directory, results are also written there as Arrow IPC files, so they survive new
+    sessions. The directory is trimmed to max_disk_bytes by evicting the least recently used files.
+    '''
+    def __init__(self, max_bytes=None, directory=None, max_disk_bytes=None):
+        settings = CONFIG['cache']
+        self.max_bytes = settings.MAX_MB * 2 ** 20 if max_bytes is None else max_bytes
+        self.directory = directory if directory is not None else settings.DIRECTORY if settings.PERSIST else None
+        self.max_disk_bytes = settings.MAX_DISK_MB * 2 ** 20 if max_disk_bytes is None else max_disk_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0].copy(deep=False)
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            df = read_arrow(path)
+        except Exception:
+            os.remove(path)
+            return None
+        os.utime(path)
+        self._remember(key, df)
+        return df.copy(deep=False)
+
+    def put(self, key, df):
+        df = df.copy(deep=False)
+        self._remember(key, df)
+        path = self._path(key)
+        if path is not None and not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            if write_arrow(df, path):
+                self._trim_disk()
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.arrow') if self.directory else None
+
+    def _remember(self, key, df):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (df, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._bytes -= self._entries.popitem(last=False)[1][1]
+
+    def _trim_disk(self):
+        files = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.arrow')
+        ]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        for path in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+INTEGER_TYPES = (np.int8, np.int16, np.int32)
+
+
+def memory_usage(df):
+    '''Bytes used by a DataFrame, including the Python strings in object columns.'''
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _downcast_integer(series):
+    if series.isna().all():
+        return series
+    low, high = series.min(), series.max()
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.bits // 8 >= series.dtype.itemsize:
+            break
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype if isinstance(series.dtype, np.dtype) else f'Int{info.bits}')
+    return series
+
+
+def _compact_strings(series, category_ratio, arrow_strings):
+    if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        return series
+    codes, categories = pd.factorize(series, sort=True)
+    if len(categories) <= category_ratio * len(series):
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+    return series.astype('string[pyarrow]') if arrow_strings else series
+
+
+def compact_series(series, category_ratio=0.5, arrow_strings=False):
+    '''
+    Smallest lossless dtype for a column, or the column itself when it is already compact.
+    Integers are downcast to the narrowest signed type holding their range and string columns
+    with at most category_ratio distinct values per row become categoricals with sorted
+    categories. Other string columns optionally become Arrow-backed strings. Floats keep
+    float64, since normalization and statistics computed in float32 would change results.
+    '''
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return _downcast_integer(series)
+    if dtype == object:
+        return _compact_strings(series, category_ratio, arrow_strings)
+    return series
+
+
+def compact_frame(df, category_ratio=0.5, arrow_strings=False):
+    '''
+    Compacts every column with compact_series. Returns the compacted frame and its memory usage
+    before and after, in bytes. Columns that are already compact are shared with df.
+    '''
+    before = memory_usage(df)
+    compacted = df.copy(deep=False)
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        result = compact_series(series, category_ratio, arrow_strings)
+        if result is not series:
+            compacted.isetitem(position, result)
+    return compacted, before, memory_usage(compacted)
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+
+class DateParseCache:
+    '''
+    Parsed datetime columns keyed by (version, column).
+
+    Each entry keeps the column it was parsed from and is only reused for a column backed by the
+    same data and index, so shallow copies of a version hit the cache while a version replaced by
+    new data is parsed again. A fixed format guessed from the first value is tried before the slow
+    per-element format='mixed' parse, and unparseable columns are cached as None.
+    '''
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def parse(self, df, column, version=None):
+        key = (id(df) if version is None else version, column)
+        series = df[column]
+        entry = self._entries.get(key)
+        if entry is not None and self._same_data(series, entry[0]):
+            self._entries.move_to_end(key)
+            return entry[1]
+        parsed = self._parse(series)
+        self._entries[key] = (series, parsed)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return parsed
+
+    def invalidate(self, version=None):
+        if version is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == version]:
+            del self._entries[key]
+
+    @staticmethod
+    def _same_data(series, source):
+        if series.dtype != source.dtype or len(series) != len(source):
+            return False
+        if not (series.index is source.index or series.index.equals(source.index)):
+            return False
+        if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            return series.array is source.array
+        values, source_values = series.to_numpy(), source.to_numpy()
+        return (
+            values.__array_interface__['data'][0] == source_values.__array_interface__['data'][0]
+            and values.strides == source_values.strides
+        )
+
+    @staticmethod
+    def _parse(series):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series
+        first_valid = series.first_valid_index()
+        if first_valid is not None and isinstance(series.loc[first_valid], str):
+            date_format = guess_datetime_format(series.loc[first_valid])
+            if date_format is not None:
+                try:
+                    return pd.to_datetime(series, format=date_format)
+                except (ValueError, TypeError):
+                    pass
+        try:
+            return pd.to_datetime(series, format='mixed')
+        except Exception:
+            return None
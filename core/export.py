@@ -0,0 +1,111 @@
+import gzip
+import os
+import tempfile
+import zipfile
+from config.config import CONFIG
+
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'feather': ('.feather', 'application/vnd.apache.arrow.file'),
+}
+
+
+def export_name(name, export_format):
+    '''File name of a version exported in export_format, e.g. "sales.csv" -> "sales.parquet".'''
+    base = name[:-len('.csv')] if name.lower().endswith('.csv') else name
+    return base + EXPORT_FORMATS[export_format][0]
+
+
+def remove_export(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class Exporter:
+    '''
+    Writes DataFrames to CSV, gzip-compressed CSV, Parquet or Feather files chunk by chunk.
+
+    Each chunk of chunk_rows rows is converted and written before the next is read, so an export
+    holds at most one converted chunk in memory on top of the frame. Exports go to temporary files
+    under directory and zips of several versions are built on disk one version at a time, loading
+    each version only while it is written. Callers remove the files with remove_export.
+    '''
+    def __init__(self, chunk_rows=None, directory=None):
+        self.chunk_rows = chunk_rows or CONFIG['export'].CHUNK_ROWS
+        self.directory = directory or CONFIG['export'].DIRECTORY
+
+    def _chunks(self, df):
+        for start in range(0, len(df), self.chunk_rows):
+            yield df.iloc[start:start + self.chunk_rows]
+
+    def _temp_path(self, suffix):
+        os.makedirs(self.directory, exist_ok=True)
+        handle, path = tempfile.mkstemp(prefix='export_', suffix=suffix, dir=self.directory)
+        os.close(handle)
+        return path
+
+    @staticmethod
+    def _check_format(export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format: {export_format}. Expected one of: {", ".join(EXPORT_FORMATS)}')
+
+    def write(self, df, path, export_format):
+        self._check_format(export_format)
+        if export_format in ('csv', 'csv.gz'):
+            self._write_csv(df, path, compress=export_format == 'csv.gz')
+        else:
+            self._write_arrow(df, path, export_format)
+
+    def export(self, df, export_format):
+        '''Writes df to a new temporary file and returns its path.'''
+        self._check_format(export_format)
+        path = self._temp_path(EXPORT_FORMATS[export_format][0])
+        try:
+            self.write(df, path, export_format)
+        except Exception:
+            remove_export(path)
+            raise
+        return path
+
+    def export_zip(self, names, load, export_format):
+        '''
+        Writes a zip holding each version in names, read with load(name), to a new temporary file
+        and returns its path. Only one version is loaded and one exported file exists at a time.
+        '''
+        self._check_format(export_format)
+        path = self._temp_path('.zip')
+        compression = zipfile.ZIP_DEFLATED if export_format == 'csv' else zipfile.ZIP_STORED
+        try:
+            with zipfile.ZipFile(path, 'w', compression) as zip_file:
+                for name in names:
+                    member = self.export(load(name), export_format)
+                    try:
+                        zip_file.write(member, export_name(name, export_format))
+                    finally:
+                        remove_export(member)
+        except Exception:
+            remove_export(path)
+            raise
+        return path
+
+    def _write_csv(self, df, path, compress):
+        with (gzip.open(path, 'wt', newline='', encoding='utf-8') if compress
+              else open(path, 'w', newline='', encoding='utf-8')) as output:
+            if not len(df):
+                df.to_csv(output, index=False)
+            for position, chunk in enumerate(self._chunks(df)):
+                chunk.to_csv(output, index=False, header=position == 0)
+
+    def _write_arrow(self, df, path, export_format):
+        import pyarrow as pa
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        if export_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(path, schema)
+        else:
+            writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression='lz4'))
+        with writer:
+            for chunk in self._chunks(df):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
@@ -0,0 +1,174 @@
+import json
+import numpy as np
+
+LOGICAL_OPS = ('OR', 'XOR', 'AND')
+
+OP_COSTS = {
+    'isna': 0,
+    'notna': 0,
+    'in': 2,
+    'not in': 2,
+    'contains': 3,
+}
+DEFAULT_OP_COST = 1
+DATE_PARSE_COST = 4
+SUBSET_RATIO = 0.5
+
+
+class Condition:
+    def __init__(self, column, condition):
+        self.column = column
+        self.condition = condition
+        self.selectivity = 1.0
+        self.cost = OP_COSTS.get(condition['op'], DEFAULT_OP_COST)
+        if 'date' in str(column).lower():
+            self.cost += DATE_PARSE_COST
+        self.key = json.dumps([column, condition], sort_keys=True, default=repr)
+
+    def evaluate(self, df, evaluate_condition, rows=None, short_circuit=False, masks=None):
+        if rows is None and masks is not None and self.key in masks:
+            return masks[self.key]
+        mask = evaluate_condition(df, self.column, self.condition, rows)
+        mask = np.asarray(mask.to_numpy(dtype=bool, na_value=False))
+        self.selectivity = mask.mean() if len(mask) else self.selectivity
+        if rows is None and masks is not None:
+            masks[self.key] = mask
+        return mask
+
+    def optimize(self):
+        pass
+
+
+class LogicalNode:
+    def __init__(self, op, children):
+        self.op = op
+        self.children = children
+        self.selectivity = 1.0
+        self.cost = sum(child.cost for child in children)
+        self.key = json.dumps([op, sorted(child.key for child in children)])
+
+    def evaluate(self, df, evaluate_condition, rows=None, short_circuit=False, masks=None):
+        if rows is None and masks is not None and self.key in masks:
+            return masks[self.key]
+        if short_circuit:
+            mask = self._evaluate_rows(df, evaluate_condition, rows, masks)
+        else:
+            mask = self._evaluate_all(df, evaluate_condition, rows, masks)
+        self.selectivity = mask.mean() if len(mask) else self.selectivity
+        if rows is None and masks is not None:
+            masks[self.key] = mask
+        return mask
+
+    def _evaluate_all(self, df, evaluate_condition, rows, masks):
+        if self.op == 'XOR':
+            counts = np.zeros(len(df) if rows is None else len(rows), dtype=np.int64)
+            for child in self.children:
+                counts += child.evaluate(df, evaluate_condition, rows, masks=masks)
+            return counts == 1
+        mask = self.children[0].evaluate(df, evaluate_condition, rows, masks=masks).copy()
+        combine = np.logical_and if self.op == 'AND' else np.logical_or
+        for child in self.children[1:]:
+            if self.op == 'AND' and not mask.any() or self.op == 'OR' and mask.all():
+                break
+            combine(mask, child.evaluate(df, evaluate_condition, rows, masks=masks), out=mask)
+        return mask
+
+    def _evaluate_subset(self, child, df, evaluate_condition, rows, positions, masks):
+        size = len(df) if rows is None else len(rows)
+        if len(positions) > SUBSET_RATIO * size:
+            return child.evaluate(df, evaluate_condition, rows, short_circuit=True, masks=masks)[positions]
+        subset = positions if rows is None else rows[positions]
+        return child.evaluate(df, evaluate_condition, subset, short_circuit=True, masks=masks)
+
+    def _evaluate_rows(self, df, evaluate_condition, rows, masks):
+        positions = np.arange(len(df) if rows is None else len(rows))
+        if self.op == 'XOR':
+            counts = np.zeros(len(positions), dtype=np.int64)
+            for child in self.children:
+                undecided = positions[counts < 2]
+                if not len(undecided):
+                    break
+                counts[undecided] += self._evaluate_subset(child, df, evaluate_condition, rows, undecided, masks)
+            return counts == 1
+        mask = np.zeros(len(positions), dtype=bool)
+        if self.op == 'AND':
+            alive = positions
+            for child in self.children:
+                alive = alive[self._evaluate_subset(child, df, evaluate_condition, rows, alive, masks)]
+                if not len(alive):
+                    break
+            mask[alive] = True
+        else:
+            pending = positions
+            for child in self.children:
+                accepted = self._evaluate_subset(child, df, evaluate_condition, rows, pending, masks)
+                mask[pending[accepted]] = True
+                pending = pending[~accepted]
+                if not len(pending):
+                    break
+        return mask
+
+    def optimize(self):
+        for child in self.children:
+            child.optimize()
+        if self.op == 'AND':
+            self.children.sort(key=lambda child: (child.cost, child.selectivity))
+        elif self.op == 'OR':
+            self.children.sort(key=lambda child: (child.cost, -child.selectivity))
+
+
+class FilterPlan:
+    '''
+    A filters dict compiled once into a tree of conditions that evaluates to a boolean NumPy mask.
+
+    After each evaluation, children are reordered by estimated cost and then by observed
+    selectivity, so cheap predicates that reject (AND) or accept (OR) the most rows run first.
+    With short_circuit, each child only sees the rows its siblings have not decided yet; while
+    more than SUBSET_RATIO of the rows are still undecided, the child runs on all of them instead
+    of paying for the gather. Passing the same masks dict to several plans evaluated on one frame
+    shares full-frame masks between identical subtrees, which are keyed independently of child
+    order.
+    '''
+    def __init__(self, filters):
+        self.root = self.compile(filters)
+
+    @classmethod
+    def compile(cls, filters):
+        if not isinstance(filters, dict):
+            raise ValueError(f'Invalid filter format: {filters}')
+        for logical_op in LOGICAL_OPS:
+            if logical_op in filters:
+                conditions = filters[logical_op]
+                if isinstance(conditions, list):
+                    children = [cls.compile(condition) for condition in conditions]
+                elif isinstance(conditions, dict):
+                    children = [cls.compile(conditions)]
+                else:
+                    raise ValueError(f'Invalid format for {logical_op} conditions: {conditions}')
+                return cls._logical_node(logical_op, children)
+        children = []
+        for key, condition in filters.items():
+            if isinstance(condition, dict) and 'op' in condition:
+                children.append(Condition(key, condition))
+            else:
+                children.append(cls.compile(condition))
+        return cls._logical_node('AND', children)
+
+    @staticmethod
+    def _logical_node(op, children):
+        if not children:
+            raise ValueError(f'No conditions given for {op} filter.')
+        return LogicalNode(op, children)
+
+    def conditions(self, node=None):
+        node = self.root if node is None else node
+        if isinstance(node, Condition):
+            yield node
+        else:
+            for child in node.children:
+                yield from self.conditions(child)
+
+    def evaluate(self, df, evaluate_condition, short_circuit=False, masks=None):
+        mask = self.root.evaluate(df, evaluate_condition, short_circuit=short_circuit, masks=masks)
+        self.root.optimize()
+        return mask
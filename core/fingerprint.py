@@ -0,0 +1,39 @@
+import hashlib
+import json
+import pandas as pd
+
+COMMAND_KEYS = ('filters', 'scruff')
+
+
+def _digest(*parts):
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else str(part).encode())
+        hasher.update(b'\x00')
+    return hasher.hexdigest()
+
+
+def fingerprint_column(series):
+    '''Hash of a column's dtype and values, independent of its name and index.'''
+    values = pd.util.hash_pandas_object(series, index=False, categorize=True).to_numpy()
+    return _digest(series.dtype, values.tobytes())
+
+
+def fingerprint_columns(df):
+    return [fingerprint_column(df.iloc[:, position]) for position in range(df.shape[1])]
+
+
+def fingerprint_frame(df, column_fingerprints=None):
+    '''Content hash of a DataFrame: its index, column names and column fingerprints.'''
+    if column_fingerprints is None:
+        column_fingerprints = fingerprint_columns(df)
+    index_values = pd.util.hash_pandas_object(df.index, categorize=True).to_numpy()
+    return _digest(
+        repr(df.index.names), df.index.dtype, index_values.tobytes(), repr(list(df.columns)), *column_fingerprints
+    )
+
+
+def command_hash(command):
+    '''Hash of the parts of a command that affect its result, so renamed outputs share it.'''
+    canonical = {key: command[key] for key in COMMAND_KEYS if command.get(key)}
+    return _digest(json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=repr))
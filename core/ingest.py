@@ -0,0 +1,180 @@
+import os
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+from config.config import CONFIG
+from core.broom import Broom
+
+
+def _pandas_column_names(names):
+    '''Column names as pd.read_csv reports them: blank names become "Unnamed: <position>" and repeats get ".1", ".2"...'''
+    result, seen = [], set()
+    for position, name in enumerate(names):
+        name = name or f'Unnamed: {position}'
+        candidate, suffix = name, 0
+        while candidate in seen:
+            suffix += 1
+            candidate = f'{name}.{suffix}'
+        seen.add(candidate)
+        result.append(candidate)
+    return result
+
+
+class FileLoader:
+    '''
+    Reads uploaded CSV, Parquet, Feather and JSON-lines files into DataFrames.
+
+    CSV and JSON lines are parsed with pyarrow's multithreaded readers when the engine is pyarrow,
+    falling back to pandas for input pyarrow rejects. CSV columns get the names pd.read_csv would
+    give them, though pyarrow already parses ISO dates and times. read_preview parses only the
+    first rows, so a preview can be shown before the full read. The preview also serves as the
+    sample for sniff_types, which finds text columns holding monetary amounts or dates; read
+    converts them when every value of the full column converts.
+    '''
+    FILE_TYPES = ('csv', 'parquet', 'feather', 'jsonl')
+
+    def __init__(self, engine=None, preview_rows=None, sniff=None):
+        settings = CONFIG['ingest']
+        self.engine = engine or settings.ENGINE
+        self.preview_rows = preview_rows or settings.PREVIEW_ROWS
+        self.sniff = settings.SNIFF_TYPES if sniff is None else sniff
+
+    @classmethod
+    def file_type(cls, name):
+        extension = os.path.splitext(name)[1].lstrip('.').lower()
+        if extension not in cls.FILE_TYPES:
+            raise ValueError(f'Unsupported file type: {extension or name}. Expected one of: {", ".join(cls.FILE_TYPES)}')
+        return extension
+
+    @staticmethod
+    def _rewind(source):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return source
+
+    def read_preview(self, source, file_type):
+        source = self._rewind(source)
+        if file_type == 'csv':
+            return pd.read_csv(source, nrows=self.preview_rows)
+        if file_type == 'jsonl':
+            return pd.read_json(source, lines=True, nrows=self.preview_rows)
+        import pyarrow as pa
+        if file_type == 'parquet':
+            import pyarrow.parquet as pq
+            batch = next(pq.ParquetFile(source).iter_batches(batch_size=self.preview_rows), None)
+            return batch.to_pandas() if batch is not None else pd.read_parquet(self._rewind(source))
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            return pd.read_feather(self._rewind(source)).head(self.preview_rows)
+        if not reader.num_record_batches:
+            return reader.read_pandas()
+        return reader.get_batch(0).slice(0, self.preview_rows).to_pandas()
+
+    def sniff_types(self, sample):
+        '''
+        Maps each text column of sample whose values are all monetary amounts to "monetary", and
+        each one whose values all parse as dates in a single format to that format.
+        '''
+        types = {}
+        if not self.sniff:
+            return types
+        for column in sample.columns[(sample.dtypes == object).to_numpy()]:
+            series = sample[column].dropna()
+            if series.empty or not series.map(lambda value: isinstance(value, str)).all():
+                continue
+            if Broom._is_monetary(series) and Broom._clean_monetary(series).notna().all():
+                types[column] = 'monetary'
+                continue
+            date_format = guess_datetime_format(series.iloc[0])
+            if date_format is not None and pd.to_datetime(series, format=date_format, errors='coerce').notna().all():
+                types[column] = date_format
+        return types
+
+    def read(self, source, file_type, types=None):
+        source = self._rewind(source)
+        if file_type == 'csv':
+            df = self._read_csv(source, types)
+        elif file_type == 'jsonl':
+            df = self._read_jsonl(source)
+        elif file_type == 'parquet':
+            df = pd.read_parquet(source)
+        else:
+            df = pd.read_feather(source)
+        return self.convert_types(df, types) if types else df
+
+    def convert_types(self, df, types):
+        for column, kind in types.items():
+            if column not in df.columns or df[column].dtype != object:
+                continue
+            series = df[column]
+            if kind == 'monetary':
+                converted = Broom._clean_monetary(series)
+            else:
+                converted = pd.to_datetime(series, format=kind, errors='coerce')
+            if converted.isna().sum() == series.isna().sum():
+                df[column] = converted
+        return df
+
+    def _read_csv(self, source, types=None):
+        if self.engine == 'pyarrow':
+            try:
+                import pyarrow as pa
+                from pyarrow import csv
+            except ImportError:
+                pass
+            else:
+                try:
+                    table = csv.read_csv(
+                        source,
+                        read_options=csv.ReadOptions(use_threads=True),
+                        convert_options=csv.ConvertOptions(strings_can_be_null=True)
+                    )
+                except pa.ArrowInvalid:
+                    source = self._rewind(source)
+                else:
+                    columns = _pandas_column_names(table.column_names)
+                    return self._to_pandas(self._convert_monetary(table, columns, types or {}), columns)
+        return pd.read_csv(source)
+
+    def _read_jsonl(self, source):
+        if self.engine == 'pyarrow':
+            try:
+                import pyarrow as pa
+                from pyarrow import json
+            except ImportError:
+                pass
+            else:
+                try:
+                    table = json.read_json(source, read_options=json.ReadOptions(use_threads=True))
+                except pa.ArrowInvalid:
+                    source = self._rewind(source)
+                else:
+                    return self._to_pandas(table, table.column_names)
+        return pd.read_json(source, lines=True)
+
+    @staticmethod
+    def _convert_monetary(table, columns, types):
+        '''Converts monetary columns with Arrow compute, leaving those Arrow cannot cast to convert_types.'''
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        for position, column in enumerate(columns):
+            field = table.schema.field(position)
+            if types.get(column) != 'monetary' or not pa.types.is_string(field.type):
+                continue
+            try:
+                amounts = pc.cast(pc.replace_substring_regex(table.column(position), r'[$£€¥,]', ''), pa.float64())
+            except pa.ArrowInvalid:
+                continue
+            table = table.set_column(position, field.with_type(pa.float64()), amounts)
+        return table
+
+    @staticmethod
+    def _to_pandas(table, columns):
+        import pyarrow as pa
+        df = table.to_pandas(split_blocks=True, date_as_object=False)
+        df.columns = columns
+        for position, field in enumerate(table.schema):
+            if pa.types.is_null(field.type):
+                df.isetitem(position, pd.Series(np.nan, index=df.index))
+        return df
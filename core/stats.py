@@ -0,0 +1,181 @@
+import numpy as np
+
+OUTLIER_METHODS = ('zscore', 'iqr', 'mad')
+MAD_SCALE = 1.4826
+
+
+def robust_bounds(method, q1, median, q3, mad, threshold=3.0, iqr_multiplier=1.5):
+    '''
+    Inclusive (low, high) bounds of the values kept by the iqr and mad outlier methods. Works on
+    scalars or per-column arrays. mad bounds are median +- threshold robust standard deviations,
+    estimated as 1.4826 * MAD, which equals the standard deviation for normal data.
+    '''
+    if method == 'iqr':
+        iqr = q3 - q1
+        return q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr
+    if method == 'mad':
+        spread = threshold * MAD_SCALE * mad
+        return median - spread, median + spread
+    raise ValueError(f'Unknown outlier method: {method}. Expected one of: {", ".join(OUTLIER_METHODS)}')
+
+
+def _weighted_quantile(values, weights, q):
+    '''Linear-interpolated quantile, as numpy and pandas define it, of sorted values with integer counts.'''
+    cumulative = np.cumsum(weights)
+    position = q * (cumulative[-1] - 1)
+    lower, upper = np.floor(position), np.ceil(position)
+    low = values[np.searchsorted(cumulative, lower, side='right')]
+    high = values[np.searchsorted(cumulative, upper, side='right')]
+    return float(low + (high - low) * (position - lower))
+
+
+class TDigest:
+    '''
+    Mergeable quantile sketch (a merging t-digest) of at most about compression / 2 centroids.
+
+    While a column has at most 2 * compression distinct values they are all kept with their
+    counts, so small and low-cardinality columns get exact quantiles and MAD. Beyond that,
+    centroids are merged so that each covers at most one unit of the k1 scale function, which
+    keeps them smallest near the tails. Digests of separate chunks or partitions merge into one.
+
+    Accuracy once compressed: the rank error of quantile q is bounded by about
+    pi * sqrt(q * (1 - q)) / compression, 0.8% of rows at the median with the default compression
+    of 200. Thanks to interpolation between centroids it is typically around 0.02% on continuous
+    data, and the MAD is typically within 0.1%.
+    '''
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.count = 0
+        self.exact = True
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+
+    def update(self, values):
+        '''Adds a 1-D array of non-NaN values.'''
+        if len(values):
+            self._add(np.asarray(values, dtype='float64'), np.ones(len(values)), True)
+
+    def merge(self, other):
+        if other.count:
+            self._add(other._means, other._weights, other.exact)
+
+    def quantile(self, q):
+        if not self.count:
+            return np.nan
+        if self.exact:
+            return _weighted_quantile(self._means, self._weights, q)
+        centers = np.cumsum(self._weights) - self._weights / 2
+        return float(np.interp(
+            q * self.count,
+            np.concatenate(([0.0], centers, [self.count])),
+            np.concatenate(([self._means[0]], self._means, [self._means[-1]]))
+        ))
+
+    def mad(self, median=None):
+        '''
+        Median absolute deviation. Once compressed, it is the distance d around the median that
+        holds half the values, found by bisection on the digest's interpolated distribution.
+        '''
+        if not self.count:
+            return np.nan
+        median = self.quantile(0.5) if median is None else median
+        if self.exact:
+            deviations = np.abs(self._means - median)
+            order = np.argsort(deviations, kind='stable')
+            return _weighted_quantile(deviations[order], self._weights[order], 0.5)
+        centers = np.cumsum(self._weights) - self._weights / 2
+        positions = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self._means[0]], self._means, [self._means[-1]]))
+        low, high = 0.0, max(self._means[-1] - median, median - self._means[0])
+        for _ in range(60):
+            middle = (low + high) / 2
+            inside = np.interp(median + middle, values, positions) - np.interp(median - middle, values, positions)
+            low, high = (middle, high) if inside < self.count / 2 else (low, middle)
+        return (low + high) / 2
+
+    def _add(self, means, weights, exact):
+        means = np.concatenate((self._means, means))
+        weights = np.concatenate((self._weights, weights))
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        self.count = weights.sum()
+        self.exact = self.exact and exact
+        if self.exact:
+            starts = np.flatnonzero(np.concatenate(([True], means[1:] != means[:-1])))
+            means, weights = means[starts], np.add.reduceat(weights, starts)
+        if len(means) > 2 * self.compression:
+            means, weights = self._compress(means, weights)
+            self.exact = False
+        self._means, self._weights = means, weights
+
+    def _compress(self, means, weights):
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.concatenate(([True], k[1:] != k[:-1])))
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return merged_means, merged_weights
+
+
+class OnlineStats:
+    '''
+    One-pass statistics of a numeric column, fed chunk by chunk with bounded memory.
+
+    Mean and variance use Welford's update, generalised to whole chunks (Chan et al.), so the
+    result matches a two-pass computation up to floating-point rounding. Min, max and counts are
+    exact. With quantiles, a TDigest also estimates the median, quartiles and MAD within the
+    accuracy documented there. Statistics of separate partitions combine with merge.
+    '''
+    def __init__(self, quantiles=False, compression=200):
+        self.count = 0
+        self.na_count = 0
+        self.mean = np.nan
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.digest = TDigest(compression) if quantiles else None
+
+    def update(self, series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        present = values[~np.isnan(values)]
+        self.na_count += len(values) - len(present)
+        if not len(present):
+            return
+        chunk_mean = present.mean()
+        self._combine(len(present), chunk_mean, ((present - chunk_mean) ** 2).sum(), present.min(), present.max())
+        if self.digest is not None:
+            self.digest.update(present)
+
+    def merge(self, other):
+        self.na_count += other.na_count
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        if self.digest is not None and other.digest is not None:
+            self.digest.merge(other.digest)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def quantile(self, q):
+        return self.digest.quantile(q) if self.digest is not None else np.nan
+
+    def mad(self):
+        return self.digest.mad() if self.digest is not None else np.nan
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        if self.count:
+            delta = mean - self.mean
+            self.mean += delta * count / total
+            self.m2 += m2 + delta ** 2 * self.count * count / total
+        else:
+            self.mean, self.m2 = mean, m2
+        self.count = total
+        self.min = np.fmin(self.min, low)
+        self.max = np.fmax(self.max, high)
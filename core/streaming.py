@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+from config.config import CONFIG
+from core.broom import Broom
+from core.stats import OnlineStats
+from core.vacuum import Vacuum
+
+
+def _reconcile_dtypes(dtypes):
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+        return np.dtype('float64')
+    return np.dtype(object)
+
+
+class _DuplicateFilter:
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def keep(self, df):
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, self._seen)
+        self._seen = np.union1d(self._seen, hashes[keep])
+        return keep
+
+
+class ChunkedRunner:
+    '''
+    Runs a command over a CSV file chunk by chunk, writing the result incrementally.
+
+    Filters and the row-local scruff stages are applied to each chunk as it is read. Stages that
+    need statistics over the whole file (empty-column detection, z-score outliers, mean/median
+    fill, min-max normalization) are resolved by extra passes over the input before the output
+    pass, and duplicate rows are dropped with a running set of row hashes.
+
+    Outliers are removed with one combined mask built from statistics of the pre-filter data,
+    like the matrix numeric engine of Broom.scruff. Statistics are gathered in one pass per stage
+    with core.stats.OnlineStats, so memory does not grow with the file: means, variances, min
+    and max match the in-memory path up to floating-point rounding, while medians, quartiles and
+    MAD (median fill, iqr and mad outliers) are t-digest estimates, exact for columns with at
+    most 400 distinct values.
+    '''
+    def __init__(self, broom=None, vacuum=None, chunksize=None):
+        self.broom = broom if broom is not None else Broom()
+        self.vacuum = vacuum if vacuum is not None else Vacuum()
+        self.chunksize = chunksize or CONFIG['streaming'].CHUNK_ROWS
+
+    def read_chunks(self, input_path, dtypes=None):
+        empty = True
+        with pd.read_csv(input_path, chunksize=self.chunksize, dtype=dtypes) as reader:
+            for chunk in reader:
+                empty = False
+                yield chunk
+        if empty:
+            yield pd.read_csv(input_path, nrows=0, dtype=dtypes)
+
+    def scan_dtypes(self, input_path):
+        seen = {}
+        for chunk in self.read_chunks(input_path):
+            for column, dtype in chunk.dtypes.items():
+                seen.setdefault(column, set()).add(dtype)
+        return {column: _reconcile_dtypes(dtypes) for column, dtypes in seen.items()}
+
+    def run_command(self, input_path, command, output_path):
+        dtypes = self.scan_dtypes(input_path)
+        plan = self._build_plan(input_path, dtypes, command)
+        options = command.get('scruff')
+        state = self._new_state(options)
+        row_count = 0
+        header = True
+        with open(output_path, 'w', newline='', encoding='utf-8') as output:
+            for chunk in self._filtered_chunks(input_path, dtypes, command):
+                result = self._transform(chunk, options, plan, state)
+                result.to_csv(output, index=False, header=header)
+                header = False
+                row_count += len(result)
+        return row_count
+
+    def _filtered_chunks(self, input_path, dtypes, command):
+        return self.vacuum.apply_command_chunked(self.read_chunks(input_path, dtypes), command)
+
+    def _new_state(self, options):
+        return {
+            'duplicates': _DuplicateFilter() if options and options.get('drop_duplicate_rows') else None,
+            'carry': {}
+        }
+
+    def _build_plan(self, input_path, dtypes, command):
+        plan = {}
+        options = command.get('scruff')
+        if not options:
+            return plan
+        fill_method = options.get('fill_method', 'mean') if options.get('fill_numeric_na') else None
+        if fill_method == 'backward':
+            raise ValueError('Backward fill is not supported in streaming mode.')
+        if options.get('drop_empty_columns'):
+            non_empty = None
+            for chunk in self._filtered_chunks(input_path, dtypes, command):
+                notna = self._transform(chunk, options, plan, None, until='columns').notna().any().to_numpy()
+                non_empty = notna if non_empty is None else non_empty | notna
+            plan['non_empty'] = non_empty
+        if options.get('handle_outliers'):
+            plan['outlier_stats'] = self._collect_stats(
+                input_path, dtypes, command, plan, until='numeric',
+                quantiles=options.get('outlier_method', 'zscore') != 'zscore'
+            )
+        if options.get('normalize_numeric') or fill_method in ('mean', 'median'):
+            plan['fill_stats'] = self._collect_stats(
+                input_path, dtypes, command, plan,
+                until='fill' if options.get('handle_outliers') else 'numeric',
+                quantiles=fill_method == 'median'
+            )
+        return plan
+
+    def _collect_stats(self, input_path, dtypes, command, plan, until, quantiles=False):
+        options = command['scruff']
+        state = self._new_state(options)
+        stats = {}
+        for chunk in self._filtered_chunks(input_path, dtypes, command):
+            processed = self._transform(chunk, options, plan, state, until=until)
+            for column in processed.select_dtypes(include=[np.number]).columns:
+                stats.setdefault(column, OnlineStats(quantiles)).update(processed[column])
+        return stats
+
+    def _transform(self, chunk, options, plan, state, until=None):
+        if not options:
+            return chunk
+        excluded_columns = options.get('excluded_columns', [])
+        processed = chunk[[col for col in chunk.columns if col not in excluded_columns]].copy()
+
+        processed = self.broom._handle_column_operations(
+            processed, {**options, 'drop_empty_columns': False, 'drop_duplicate_columns': False}
+        )
+        if until == 'columns':
+            return processed
+        if options.get('drop_empty_columns'):
+            processed = processed.loc[:, plan['non_empty']]
+        if options.get('drop_duplicate_columns'):
+            processed = processed.loc[:, ~processed.columns.duplicated()]
+
+        processed = self.broom._handle_row_operations(processed, {**options, 'drop_duplicate_rows': False})
+        if state['duplicates'] is not None:
+            processed = processed[state['duplicates'].keep(processed)]
+        if until == 'numeric':
+            return processed
+
+        processed = self._handle_numeric_operations(processed, options, plan, state, until)
+        if until == 'fill':
+            return processed
+
+        processed = self.broom._handle_text_operations(processed, options)
+        processed = self.broom._handle_value_replacement(processed, options)
+        if excluded_columns:
+            processed = pd.concat([processed, chunk[excluded_columns]], axis=1)
+        return processed
+
+    def _handle_numeric_operations(self, df, options, plan, state, until):
+        if options.get('normalize_numeric') or options.get('handle_outliers') or options.get('fill_numeric_na'):
+            numeric_columns = df.select_dtypes(include=[np.number]).columns
+            if options.get('handle_outliers'):
+                outlier_method = options.get('outlier_method', 'zscore')
+                z_threshold = options.get('z_score_threshold', 3.0)
+                keep = np.ones(len(df), dtype=bool)
+                for column in numeric_columns:
+                    stats = plan['outlier_stats'][column]
+                    if outlier_method == 'zscore':
+                        z_scores = np.abs((df[column] - stats.mean) / stats.std)
+                        keep &= (z_scores < z_threshold).to_numpy()
+                    else:
+                        low, high = self.broom._outlier_bounds(
+                            options, stats.quantile(0.25), stats.median, stats.quantile(0.75), stats.mad()
+                        )
+                        keep &= (df[column].between(low, high) | df[column].isna()).to_numpy()
+                df = df[keep]
+            if until == 'fill':
+                return df
+            for column in numeric_columns:
+                df[column] = self._fill_and_normalize(df[column], options, plan, state)
+        return self.broom._handle_numeric_operations(
+            df, {'numeric_conversion': options.get('numeric_conversion')}
+        )
+
+    def _fill_and_normalize(self, series, options, plan, state):
+        fill_value = None
+        if options.get('fill_numeric_na'):
+            fill_method = options.get('fill_method', 'mean')
+            if fill_method == 'mean':
+                fill_value = plan['fill_stats'][series.name].mean
+            elif fill_method == 'median':
+                fill_value = plan['fill_stats'][series.name].median
+            elif fill_method == 'zero':
+                fill_value = 0
+            elif fill_method == 'forward':
+                series = series.ffill()
+                if series.name in state['carry']:
+                    series = series.fillna(state['carry'][series.name])
+                present = series.dropna()
+                if len(present):
+                    state['carry'][series.name] = present.iloc[-1]
+            if fill_value is not None:
+                series = series.fillna(fill_value)
+        if options.get('normalize_numeric'):
+            stats = plan['fill_stats'][series.name]
+            low, high, count = stats.min, stats.max, stats.count
+            if fill_value is not None and not pd.isna(fill_value) and stats.na_count:
+                low, high = np.fmin(low, fill_value), np.fmax(high, fill_value)
+                count += stats.na_count
+            if not (count > 1 and low == high):
+                series = (series - low) / (high - low)
+        return series
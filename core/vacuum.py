@@ -0,0 +1,182 @@
+import os
+import json
+import operator
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+import pandas as pd
+from config.config import CONFIG
+from core.dates import DateParseCache
+from core.filters import FilterPlan
+
+
+class Vacuum:
+    MAX_CACHED_PLANS = 128
+    CATEGORY_OPS = ('==', '!=', '<', '<=', '>', '>=', 'between', 'contains')
+
+    def __init__(self, short_circuit=None):
+        self.OPS = self._get_OPS()
+        self.short_circuit = CONFIG['filters'].SHORT_CIRCUIT if short_circuit is None else short_circuit
+        self._plans = OrderedDict()
+        self.date_cache = DateParseCache()
+
+    def _get_OPS(self):
+        return {
+            '==': operator.eq,
+            '!=': operator.ne,
+            '<': operator.lt,
+            '<=': operator.le,
+            '>': operator.gt,
+            '>=': operator.ge,
+            'in': lambda x, y: x.isin(y if isinstance(y, list) else [y]),
+            'not in': lambda x, y: ~x.isin(y if isinstance(y, list) else [y]),
+            'isna': lambda x: x.isna(),
+            'notna': lambda x: x.notna(),
+            'between': lambda x, y: x.between(y[0], y[1]),
+            'contains': lambda x, y: x.str.contains(y, case=False, na=False),
+            '+': operator.add,
+            '-': operator.sub,
+            '*': operator.mul,
+            '/': operator.truediv,
+            '//': operator.floordiv,
+            '%': operator.mod,
+            '**': operator.pow,
+            '&': operator.and_,
+            '|': operator.or_,
+            '^': operator.xor,
+            '~': operator.invert,
+            '<<': operator.lshift,
+            '>>': operator.rshift
+        }
+
+    def _get_date_series(self, df, column, value, version=None):
+        parsed = self.date_cache.parse(df, column, version)
+        if parsed is None:
+            return df[column], value
+        try:
+            return parsed, pd.to_datetime(value)
+        except:
+            return df[column], value
+
+    def apply_filter(self, df, column, condition, version=None):
+        if column not in df.columns:
+            raise ValueError(f'Column "{column}" not found in DataFrame.')
+        return self.evaluate_condition(df, column, condition, version=version)
+
+    def evaluate_condition(self, df, column, condition, rows=None, version=None):
+        op = condition['op']
+        value = condition.get('value')
+        if op not in self.OPS:
+            raise ValueError(f'Unsupported operation "{op}"')
+        if 'date' in column.lower():
+            series, value = self._get_date_series(df, column, value, version)
+        else:
+            series = df[column]
+        if rows is not None:
+            series = series.iloc[rows]
+        if op in ['isna', 'notna']:
+            return self.OPS[op](series)
+        elif value is not None and op in self.CATEGORY_OPS and isinstance(series.dtype, pd.CategoricalDtype):
+            return self._evaluate_categories(series, op, value)
+        elif value is not None:
+            return self.OPS[op](series, value)
+        else:
+            raise ValueError(f'Missing value for operation "{op}" on column "{column}"')
+
+    def _evaluate_categories(self, series, op, value):
+        '''
+        Evaluates op once per category rather than once per row and maps the result through the
+        codes, which also allows ordering comparisons on unordered categoricals. Missing values
+        match only "!=", as they do in object columns.
+        '''
+        categories = pd.Series(series.cat.categories)
+        matches = np.append(self.OPS[op](categories, value).to_numpy(dtype=bool), op == '!=')
+        return pd.Series(matches[series.cat.codes.to_numpy()], index=series.index)
+
+    def compile_filters(self, filters):
+        key = json.dumps(filters, sort_keys=True, default=repr)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = FilterPlan(filters)
+            self._plans[key] = plan
+            if len(self._plans) > self.MAX_CACHED_PLANS:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(key)
+        return plan
+
+    def evaluate_plan(self, df, plan, version=None, masks=None):
+        for condition in plan.conditions():
+            op = condition.condition['op']
+            if condition.column not in df.columns:
+                raise ValueError(f'Column "{condition.column}" not found in DataFrame.')
+            if op not in self.OPS:
+                raise ValueError(f'Unsupported operation "{op}"')
+            if op not in ['isna', 'notna'] and condition.condition.get('value') is None:
+                raise ValueError(f'Missing value for operation "{op}" on column "{condition.column}"')
+        evaluate_condition = partial(self.evaluate_condition, version=version)
+        return plan.evaluate(df, evaluate_condition, short_circuit=self.short_circuit, masks=masks)
+
+    def build_mask(self, df, filters, version=None):
+        return pd.Series(self.evaluate_plan(df, self.compile_filters(filters), version), index=df.index)
+
+    def apply_command(self, df, command, get_count=False, version=None, masks=None):
+        filters = command.get('filters')
+        if filters is None:
+            filtered_df = df
+        else:
+            mask = self.evaluate_plan(df, self.compile_filters(filters), version, masks)
+            filtered_df = df[mask]
+        return (filtered_df, len(filtered_df)) if get_count else filtered_df
+
+    def apply_command_chunked(self, chunks, command):
+        filters = command.get('filters')
+        plan = self.compile_filters(filters) if filters else None
+        for chunk in chunks:
+            yield chunk[self.evaluate_plan(chunk, plan)] if plan else chunk
+
+    def report_command(self, filter_df, row_count=0):
+        report = '\nCommand results:\n'
+        if filter_df is not None and not filter_df.empty:
+            report += 'First five rows of filtered DataFrame:\n'
+            report += filter_df.head().to_string() + '\n'
+            report += f'Total number of rows for filtered DataFrame: {row_count}\n\n'
+            report += 'Summary statistics:\n'
+            report += filter_df.describe(include='all').to_string() + '\n\n'
+            report += 'Data types:\n'
+            report += filter_df.dtypes.to_string() + '\n\n'
+            report += 'Missing values per column:\n'
+            report += filter_df.isna().sum().to_string() + '\n\n'
+            report += 'Unique values per column:\n'
+            for column in filter_df.columns:
+                unique_values = filter_df[column].nunique()
+                report += f'{column}: {unique_values} unique values\n'
+        else:
+            report += 'No rows match the given criteria.\n'
+        if row_count > 0:
+            report += f'\nTotal number of rows for filtered DataFrame: {row_count}\n'
+        return report
+
+    def apply_commands(self, df, commands, get_counts=False, report_commands=False, save_dfs=False):
+        dfs = []
+        counts = [] if get_counts else None
+        masks = {}
+        for command in commands:
+            filename = command.get('filename', f'{command.get("description", "no_description")}.csv')
+            description = command.get('description', 'No description provided')
+            result = self.apply_command(df, command=command, get_count=get_counts, masks=masks)
+            if get_counts:
+                filter_df, count = result
+                counts.append(count)
+            else:
+                filter_df = result
+            dfs.append(filter_df)
+            if report_commands:
+                report = self.report_command(filter_df, count) if get_counts else self.report_command(filter_df)
+                dfs.append(report)
+            if save_dfs:
+                output_dir = 'data/output_dfs'
+                os.makedirs(output_dir, exist_ok=True)
+                output_path = os.path.join(output_dir, filename)
+                filter_df.to_csv(output_path, index=False)
+        return (dfs, counts) if get_counts else dfs
@@ -0,0 +1,38 @@
+from .client import (
+    LLMClient,
+)
+
+from .backends import (
+    BACKENDS,
+    LLMBackend,
+    LlamaCppBackend,
+    RemoteBackend,
+    create_backend,
+)
+
+from .parsing import (
+    CommandStream,
+    IncrementalArrayParser,
+    parse_commands,
+)
+
+from .cache import (
+    ResponseCache,
+    response_key,
+    shared_response_cache,
+)
+
+__all__ = [
+    'LLMClient',
+    'BACKENDS',
+    'LLMBackend',
+    'LlamaCppBackend',
+    'RemoteBackend',
+    'create_backend',
+    'CommandStream',
+    'IncrementalArrayParser',
+    'parse_commands',
+    'ResponseCache',
+    'response_key',
+    'shared_response_cache',
+]
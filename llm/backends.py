@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+from config.config import CONFIG
+from llm.client import LLMClient
+
+
+class LLMBackend(ABC):
+    '''
+    A chat completions server. prepare turns the handler's model-independent payload into the
+    request this server expects, and the client sends it. A backend that enforces_grammar only
+    returns output matching data/grammar.gbnf, so its responses are parsed without the
+    regex fallback.
+    '''
+    name = None
+    enforces_grammar = False
+
+    def __init__(self, api_url, model, api_key=None):
+        self.api_url = api_url
+        self.model = model
+        self.client = LLMClient(api_url, api_key)
+
+    @classmethod
+    @abstractmethod
+    def from_config(cls, grammar):
+        '''Creates the backend from its config section. grammar is the GBNF grammar of a command array.'''
+        raise NotImplementedError
+
+    def prepare(self, payload):
+        return {'model': self.model, **payload}
+
+    def complete(self, payload, timeout=None):
+        return self.client.complete(payload, timeout)
+
+    def stream(self, payload):
+        return self.client.stream(payload)
+
+
+class RemoteBackend(LLMBackend):
+    '''The hosted API configured under [LLM], authenticated with the token in auth.txt.'''
+    name = 'remote'
+
+    @classmethod
+    def from_config(cls, grammar):
+        with open('auth.txt', 'r') as f:
+            api_key = f.read().strip()
+        return cls(CONFIG['llm'].API_URI, CONFIG['llm'].MODEL_ID, api_key)
+
+
+class LlamaCppBackend(LLMBackend):
+    '''
+    A local llama.cpp server (or any OpenAI-compatible server that accepts a GBNF grammar field),
+    configured under [LLAMACPP]. No token is needed, so it runs air-gapped.
+    '''
+    name = 'llamacpp'
+    enforces_grammar = True
+
+    def __init__(self, api_url, model, grammar, api_key=None):
+        super().__init__(api_url, model, api_key)
+        self.grammar = grammar
+
+    @classmethod
+    def from_config(cls, grammar):
+        return cls(CONFIG['llamacpp'].API_URI, CONFIG['llamacpp'].MODEL_ID, grammar)
+
+    def prepare(self, payload):
+        payload = super().prepare(payload)
+        if 'repetition_penalty' in payload:
+            payload['repeat_penalty'] = payload.pop('repetition_penalty')
+        payload['grammar'] = self.grammar
+        return payload
+
+
+BACKENDS = {backend.name: backend for backend in (RemoteBackend, LlamaCppBackend)}
+
+
+def create_backend(name, grammar):
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown LLM backend: {name}. Expected one of: {", ".join(BACKENDS)}')
+    return BACKENDS[name].from_config(grammar)
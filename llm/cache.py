@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from config.config import CONFIG
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+def response_key(payload):
+    '''Hash of everything in a request payload that affects the response: model, messages and sampling.'''
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def shared_response_cache(path=None):
+    '''One cache per file per process, so sessions running concurrently share in-flight requests.'''
+    path = path or CONFIG['llm_cache'].PATH
+    with _shared_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = ResponseCache(path)
+        return _shared_caches[path]
+
+
+class ResponseCache:
+    '''
+    Persistent cache of parsed LLM responses in a SQLite file.
+
+    Entries expire ttl_seconds after they were written, and the least recently used entries are
+    evicted once the stored responses exceed max_bytes. Concurrent requests for the same key share
+    one call: the first caller computes the response and the others wait for its result. Responses
+    are stored as JSON and decoded on every read, so callers never share mutable results.
+    '''
+    def __init__(self, path=None, ttl_seconds=None, max_bytes=None):
+        settings = CONFIG['llm_cache']
+        self.path = path or settings.PATH
+        self.ttl_seconds = settings.TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+        self.max_bytes = settings.MAX_MB * 2 ** 20 if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}
+        if self.path != ':memory:' and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def get(self, key):
+        text = self._read(key)
+        return None if text is None else json.loads(text)
+
+    def put(self, key, response):
+        self._write(key, json.dumps(response))
+
+    def get_or_compute(self, key, compute):
+        '''Returns the cached response for key, or calls compute once for all concurrent callers.'''
+        text = self._read(key)
+        if text is not None:
+            return json.loads(text)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if owner:
+            try:
+                text = json.dumps(compute())
+                self._write(key, text)
+                future.set_result(text)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+        return json.loads(future.result())
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM responses')
+
+    def _read(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT response FROM responses WHERE key = ? AND created >= ?', (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return row[0] if row is not None else None
+
+    def _write(self, key, text):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)', (key, text, len(text), now, now)
+            )
+            self._conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl_seconds,))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                for evict_key, size in self._conn.execute(
+                    'SELECT key, size FROM responses ORDER BY accessed'
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (evict_key,))
+                    total -= size
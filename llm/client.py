@@ -0,0 +1,75 @@
+import json
+from config.config import CONFIG
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMClient:
+    '''
+    Client for an OpenAI-compatible chat completions endpoint.
+
+    Requests share one keep-alive connection pool. Connection errors and 429/5xx responses are
+    retried up to retries times with exponential backoff, honouring Retry-After. timeout bounds
+    the wait for each read, so a streamed response may take longer overall as long as it keeps
+    sending tokens. A read that times out is not retried, so a request never waits much longer
+    than its timeout for a server that has stopped responding.
+    '''
+    def __init__(self, api_url, api_key=None, timeout=None, retries=None, backoff=None, pool_size=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        settings = CONFIG['llm']
+        self.api_url = api_url
+        self.timeout = (settings.CONNECT_TIMEOUT, settings.TIMEOUT if timeout is None else timeout)
+        retry = Retry(
+            total=settings.RETRIES if retries is None else retries,
+            backoff_factor=settings.BACKOFF if backoff is None else backoff,
+            read=0,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_size = settings.POOL_SIZE if pool_size is None else pool_size
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_key:
+            self.session.headers['Authorization'] = f'Bearer {api_key}'
+
+    def complete(self, payload, timeout=None):
+        '''Returns the message content of a completion. timeout overrides the client's read timeout.'''
+        response = self._post(payload, stream=False, timeout=timeout)
+        return response.json()['choices'][0]['message']['content']
+
+    def stream(self, payload):
+        '''Yields the content of a completion as it arrives, from the server-sent events of a streamed request.'''
+        with self._post({**payload, 'stream': True}, stream=True, timeout=None) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                choice = json.loads(data)['choices'][0]
+                content = choice.get('delta', {}).get('content') or choice.get('text')
+                if content:
+                    yield content
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, payload, stream, timeout):
+        timeout = self.timeout if timeout is None else (self.timeout[0], timeout)
+        response = self.session.post(self.api_url, json=payload, timeout=timeout, stream=stream)
+        if response.status_code != 200:
+            error_message = f'API command failed: {response.status_code}'
+            try:
+                error_detail = response.json()
+                error_message += f' - {error_detail}'
+            except ValueError:
+                error_message += f' - {response.text}'
+            response.close()
+            raise ValueError(error_message)
+        return response
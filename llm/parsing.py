@@ -0,0 +1,105 @@
+import json
+import re
+
+
+def parse_commands(content, strict=False):
+    '''
+    Parses a response's JSON array of commands. Unless strict, falls back to the first [...] span
+    in the text, for models that wrap the array in prose.
+    '''
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        if strict:
+            raise
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        else:
+            raise ValueError('No valid JSON array found in response')
+
+
+class IncrementalArrayParser:
+    '''
+    Parses the elements of a JSON array from text fed in pieces, returning each element as soon
+    as it is complete. Text before the opening bracket is ignored, and after the closing bracket
+    the parser is done. Only bracket depth and string state are tracked per character; each
+    complete element is decoded once with json.loads.
+    '''
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text):
+        elements = []
+        for char in text:
+            if self.done:
+                break
+            if not self._started:
+                self._started = char == '['
+                continue
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in '[{':
+                self._depth += 1
+            elif char in ']}':
+                if self._depth == 0:
+                    self._flush(elements)
+                    self.done = True
+                    break
+                self._depth -= 1
+            elif char == ',' and self._depth == 0:
+                self._flush(elements)
+                continue
+            self._buffer.append(char)
+        return elements
+
+    def _flush(self, elements):
+        element = ''.join(self._buffer).strip()
+        self._buffer = []
+        if element:
+            elements.append(json.loads(element))
+
+
+class CommandStream:
+    '''
+    Iterates over the text of a streamed response while collecting the commands parsed from it
+    in commands. Once the stream is exhausted, commands holds the full result, parsed with
+    parse_commands if the text was not a clean JSON array, and on_complete is called with it.
+    '''
+    def __init__(self, chunks, on_complete=None, strict=False):
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self._strict = strict
+        self.parser = IncrementalArrayParser()
+        self.commands = []
+        self.text = ''
+
+    def __iter__(self):
+        pieces, parsing = [], True
+        for chunk in self._chunks:
+            pieces.append(chunk)
+            if parsing and not self.parser.done:
+                try:
+                    self.commands.extend(self.parser.feed(chunk))
+                except json.JSONDecodeError:
+                    parsing = False
+            yield chunk
+        self.text = ''.join(pieces)
+        if not parsing or not self.parser.done:
+            self.commands = parse_commands(self.text, self._strict)
+        if self._on_complete is not None:
+            self._on_complete(self.commands)
@@ -0,0 +1,52 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer
+import pandas as pd
+import pytest
+from benchmarks.mock_llm_server import make_handler
+from core import Broom
+
+pd.set_option('mode.copy_on_write', True)
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'input', 'example')
+STOP_WORDS = frozenset({'the', 'a', 'is', 'and', 'of', 'to', 'are'})
+
+
+class SuffixLemmatizer:
+    '''Stands in for WordNetLemmatizer so text tests run without the NLTK corpora.'''
+    def lemmatize(self, word):
+        return word[:-1] if word.endswith('s') and len(word) > 3 else word
+
+
+@pytest.fixture
+def broom():
+    broom = Broom(parallel=False, numeric_engine='sequential')
+    broom._stop_words = STOP_WORDS
+    broom._lemmatizer = SuffixLemmatizer()
+    return broom
+
+
+@pytest.fixture
+def futurama():
+    return pd.read_csv(os.path.join(EXAMPLES, 'futurama.csv'))
+
+
+@pytest.fixture
+def examples():
+    return EXAMPLES
+
+
+@pytest.fixture
+def mock_llm():
+    '''Starts mock chat completions servers answering with content and returns their URLs.'''
+    servers = []
+
+    def start(content, fail_first=0, latency=0):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(content, 7, 0, latency, fail_first))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}/v1/chat/completions'
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
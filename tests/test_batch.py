@@ -0,0 +1,35 @@
+import pandas as pd
+from core import BatchPlanner, Vacuum
+
+COMMANDS = [
+    {'filename': 'high.csv', 'filters': {'u_s_viewers': {'op': '>', 'value': 10}}, 'scruff': {'standardize_columns': True}},
+    {'filename': 'low.csv', 'filters': {'u_s_viewers': {'op': '<=', 'value': 10}}, 'scruff': {'standardize_columns': True}},
+    {'filename': 'raw.csv', 'filters': {'U.S Viewers': {'op': '>', 'value': 10}}},
+    {'filename': 'lower.csv', 'scruff': {'standardize_columns': True, 'to_lowercase': True}},
+    {'filename': 'broken.csv', 'filters': {'missing': {'op': '==', 'value': 1}}},
+]
+
+
+def run_one_by_one(broom, df, command):
+    if command.get('scruff'):
+        df = broom.scruff(df, options=command['scruff'])
+    return Vacuum().apply_command(df, command) if command.get('filters') else df
+
+
+def test_batch_matches_commands_run_one_by_one(broom, futurama):
+    results = BatchPlanner(broom, Vacuum()).execute(futurama, COMMANDS, version='futurama.csv')
+    for command, result in zip(COMMANDS[:-1], results):
+        pd.testing.assert_frame_equal(result, run_one_by_one(broom, futurama, command))
+    assert isinstance(results[-1], ValueError)
+
+
+def test_batch_scruffs_each_option_set_once(broom, futurama):
+    calls = []
+    scruff = broom.scruff
+
+    def counting_scruff(df, options=None):
+        calls.append(options)
+        return scruff(df, options=options)
+    broom.scruff = counting_scruff
+    BatchPlanner(broom, Vacuum()).execute(futurama, COMMANDS)
+    assert calls == [{'standardize_columns': True}, {'standardize_columns': True, 'to_lowercase': True}]
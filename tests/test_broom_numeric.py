@@ -0,0 +1,92 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from core import Broom
+
+FILL_METHODS = ['mean', 'median', 'zero', 'forward', 'backward']
+
+
+@pytest.fixture
+def numbers():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'score': rng.normal(50, 10, 500).round(3),
+        'count': rng.integers(0, 20, 500),
+        'maybe': np.where(rng.random(500) < 0.2, np.nan, rng.normal(0, 1, 500)),
+        'label': rng.choice(['Foo Bar', 'the cats', 'Dogs', None], 500),
+        'constant': 1.5,
+    })
+    df.loc[5, 'score'] = 500.0
+    df.loc[9, 'maybe'] = -40.0
+    return df
+
+
+def numeric_options():
+    for outliers, fill, normalize, fill_method in itertools.product([False, True], [False, True], [False, True], FILL_METHODS):
+        yield {
+            'standardize_columns': True, 'drop_duplicate_rows': True, 'handle_outliers': outliers,
+            'fill_numeric_na': fill, 'normalize_numeric': normalize, 'fill_method': fill_method,
+            'to_lowercase': True, 'remove_special_chars': True,
+        }
+
+
+@pytest.fixture(scope='module')
+def parallel_broom():
+    return Broom(parallel=True, workers=2, chunk_rows=64, numeric_engine='sequential')
+
+
+@pytest.mark.parametrize('options', list(numeric_options()))
+def test_parallel_scruff_matches_sequential(broom, parallel_broom, numbers, options):
+    pd.testing.assert_frame_equal(parallel_broom.scruff(numbers, options), broom.scruff(numbers, options))
+
+
+def test_parallel_scruff_of_example(broom, parallel_broom, futurama):
+    options = {'fill_numeric_na': True, 'normalize_numeric': True, 'to_lowercase': True, 'drop_duplicate_rows': True}
+    pd.testing.assert_frame_equal(parallel_broom.scruff(futurama, options), broom.scruff(futurama, options))
+
+
+
+@pytest.mark.parametrize('options', [options for options in numeric_options() if not options['handle_outliers']])
+def test_matrix_engine_matches_sequential_without_outliers(broom, numbers, options):
+    matrix = Broom(parallel=False, numeric_engine='matrix')
+    pd.testing.assert_frame_equal(matrix.scruff(numbers, options), broom.scruff(numbers, options), rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['zscore', 'iqr', 'mad'])
+@pytest.mark.parametrize('fill_method', FILL_METHODS)
+def test_matrix_engine_removes_outliers_with_one_mask(broom, numbers, method, fill_method):
+    numbers = numbers.drop(columns='constant')
+    options = {'handle_outliers': True, 'outlier_method': method, 'fill_numeric_na': True,
+               'fill_method': fill_method, 'normalize_numeric': True}
+    numeric = numbers.select_dtypes(include=[np.number])
+    if method == 'zscore':
+        keep = (((numeric - numeric.mean()) / numeric.std()).abs() < 3.0).all(axis=1)
+    else:
+        q1, median, q3 = numeric.quantile(0.25), numeric.median(), numeric.quantile(0.75)
+        low, high = broom._outlier_bounds(options, q1, median, q3, (numeric - median).abs().median())
+        keep = ((numeric >= low) & (numeric <= high) | numeric.isna()).all(axis=1)
+    assert 0 < keep.sum() < len(numbers)
+    expected = broom.scruff(numbers[keep], {**options, 'handle_outliers': False})
+    result = Broom(parallel=False, numeric_engine='matrix').scruff(numbers, options)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+
+
+def test_sequential_is_the_default_engine():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'x': rng.normal(0, 1, 200), 'y': rng.normal(0, 1, 200)})
+    df.loc[0] = [100.0, 100.0]
+    df.loc[1, 'y'] = 4.0
+    options = {'handle_outliers': True}
+    sequential = Broom(parallel=False, numeric_engine='sequential').scruff(df, options)
+    matrix = Broom(parallel=False, numeric_engine='matrix').scruff(df, options)
+    assert 1 not in sequential.index and 1 in matrix.index
+    pd.testing.assert_frame_equal(Broom(parallel=False).scruff(df, options), sequential)
+
+
+def test_normalize_integer_column():
+    for engine in ('sequential', 'matrix'):
+        result = Broom(parallel=False, numeric_engine=engine).scruff(
+            pd.DataFrame({'x': [-100, 0, 100]}), {'normalize_numeric': True}
+        )
+        assert result['x'].tolist() == [0.0, 0.5, 1.0]
@@ -0,0 +1,64 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+
+TEXT_OPTIONS = ['remove_accents', 'to_lowercase', 'remove_special_chars', 'remove_stopwords', 'lemmatize']
+ALL_TEXT_OPTIONS = [dict(zip(TEXT_OPTIONS, flags)) for flags in itertools.product([False, True], repeat=5)]
+VALUES = [
+    'Héllo  Wörld!', ' The cats   are running\tfast ', None, np.nan, 3, 4.5, '', '  ',
+    'Ünïcödé ﬁ ligature', 'Printers IS broken; dogs & cats', 'İstanbul', 'x\x1cy',
+]
+
+
+@pytest.fixture
+def text():
+    return pd.Series(VALUES * 3, dtype=object, index=list(range(len(VALUES) * 3))[::-1], name='text')
+
+
+@pytest.mark.parametrize('options', ALL_TEXT_OPTIONS)
+def test_clean_text_series_matches_clean_text(broom, text, options):
+    expected = text.apply(lambda value: broom._clean_text(value, **options))
+    pd.testing.assert_series_equal(broom._clean_text_series(text, **options), expected)
+
+
+@pytest.mark.parametrize('options', ALL_TEXT_OPTIONS)
+def test_clean_text_column_matches_clean_text(broom, text, options):
+    expected = text.apply(lambda value: broom._clean_text(value, **options))
+    pd.testing.assert_series_equal(broom._clean_text_column(text, options), expected)
+
+
+def test_clean_text_series_of_missing_values(broom):
+    series = pd.Series([None, np.nan], dtype=object)
+    assert broom._clean_text_series(series, **ALL_TEXT_OPTIONS[-1]).tolist() == ['', '']
+    assert broom._clean_text_series(series.iloc[:0], **ALL_TEXT_OPTIONS[-1]).tolist() == []
+
+
+def test_scruff_text_columns(broom, futurama):
+    options = {'to_lowercase': True, 'remove_special_chars': True, 'remove_stopwords': True, 'lemmatize': True}
+    result = broom.scruff(futurama, options)
+    for column in futurama.select_dtypes(include=[object]).columns:
+        expected = futurama[column].apply(lambda value: broom._clean_text(
+            value, remove_accents=False, to_lowercase=True, remove_special_chars=True,
+            remove_stopwords=True, lemmatize=True
+        ))
+        pd.testing.assert_series_equal(result[column], expected)
+
+
+@pytest.mark.parametrize('options', ALL_TEXT_OPTIONS)
+def test_clean_text_column_keeps_categoricals(broom, options):
+    series = pd.Series(['Cat', 'cats', None, 'Dog ', 'dog'] * 4, dtype='category', name='pet')
+    expected = series.astype(object).apply(lambda value: broom._clean_text(value, **options))
+    result = broom._clean_text_column(series, options)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.astype(object).tolist() == expected.tolist()
+    assert sorted(result.cat.categories) == sorted(set(expected))
+
+
+def test_clean_text_column_adds_empty_category_only_for_missing_values(broom):
+    options = dict.fromkeys(TEXT_OPTIONS, False) | {'to_lowercase': True}
+    complete = broom._clean_text_column(pd.Series(['A', 'b'], dtype='category'), options)
+    assert list(complete.cat.categories) == ['a', 'b']
+    missing = broom._clean_text_column(pd.Series(['A', None], dtype='category'), options)
+    assert missing.tolist() == ['a', '']
+    assert list(missing.cat.categories) == ['a', '']
@@ -0,0 +1,59 @@
+import json
+import os
+import pandas as pd
+import pytest
+import cli
+
+
+@pytest.fixture
+def commands_path(tmp_path):
+    path = tmp_path / 'commands.json'
+    path.write_text(json.dumps([
+        {'filename': 'high.csv', 'filters': {'U.S Viewers': {'op': '>', 'value': 10}}},
+        {'filename': 'lower.csv', 'scruff': {'to_lowercase': True}},
+    ]))
+    return path
+
+
+def test_get_output_dirs_single_input():
+    assert cli.get_output_dirs('out', ['a/events.csv']) == {'a/events.csv': 'out'}
+
+
+def test_get_output_dirs_suffixes_colliding_names():
+    output_dirs = cli.get_output_dirs('out', ['a/events.csv', 'b/events.csv', 'events_2.csv', 'c/events.json'])
+    assert output_dirs == {
+        'a/events.csv': os.path.join('out', 'events'),
+        'b/events.csv': os.path.join('out', 'events_2'),
+        'events_2.csv': os.path.join('out', 'events_2_2'),
+        'c/events.json': os.path.join('out', 'events_3'),
+    }
+
+
+def test_main_matches_in_memory_commands(tmp_path, examples, commands_path, capsys):
+    input_path = os.path.join(examples, 'futurama.csv')
+    assert cli.main([input_path, '-c', str(commands_path), '-o', str(tmp_path / 'out')]) == 0
+    df = pd.read_csv(input_path)
+    high = pd.read_csv(tmp_path / 'out' / 'high.csv')
+    pd.testing.assert_frame_equal(high, df[df['U.S Viewers'] > 10].reset_index(drop=True))
+    assert f'high.csv: {len(high)} rows' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_main_keeps_inputs_with_the_same_name_apart(tmp_path, examples, commands_path, workers):
+    df = pd.read_csv(os.path.join(examples, 'futurama.csv'))
+    for directory, rows in (('a', 30), ('b', 20)):
+        (tmp_path / directory).mkdir()
+        df.head(rows).to_csv(tmp_path / directory / 'events.csv', index=False)
+    argv = [str(tmp_path / 'a' / 'events.csv'), str(tmp_path / 'b' / 'events.csv'), '-c', str(commands_path),
+            '-o', str(tmp_path / 'out'), '-w', str(workers)]
+    assert cli.main(argv) == 0
+    assert len(pd.read_csv(tmp_path / 'out' / 'events' / 'lower.csv')) == 30
+    assert len(pd.read_csv(tmp_path / 'out' / 'events_2' / 'lower.csv')) == 20
+
+
+def test_main_rejects_repeated_inputs(tmp_path, examples, commands_path, capsys):
+    input_path = os.path.join(examples, 'futurama.csv')
+    repeated = os.path.join(examples, '..', 'example', 'futurama.csv')
+    assert cli.main([input_path, repeated, '-c', str(commands_path), '-o', str(tmp_path / 'out')]) == 2
+    assert 'more than once' in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
@@ -0,0 +1,119 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from core import Vacuum, compact_frame
+from core.compaction import compact_series
+
+FILTERS = [
+    {'city': {'op': '==', 'value': 'Paris'}},
+    {'city': {'op': '!=', 'value': 'Paris'}},
+    {'city': {'op': '<', 'value': 'M'}},
+    {'city': {'op': 'between', 'value': ['L', 'N']}},
+    {'city': {'op': 'contains', 'value': 'LL'}},
+    {'city': {'op': 'in', 'value': ['Nice', 'Nope']}},
+    {'city': {'op': 'isna'}},
+    {'status': {'op': '==', 'value': 'missing'}},
+    {'age': {'op': 'between', 'value': [20, 30]}},
+]
+
+
+@pytest.fixture
+def people():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(2000),
+        'age': rng.integers(18, 90, 2000),
+        'score': rng.normal(size=2000),
+        'half': rng.integers(0, 4, 2000) / 2,
+        'city': rng.choice(['Paris', 'Lyon', 'Nice', 'Lille', None], 2000),
+        'status': rng.choice(['active', 'inactive'], 2000),
+        'name': [f'user {i}' for i in range(2000)],
+        'flag': rng.random(2000) > .5,
+        'big': rng.integers(-2 ** 40, 2 ** 40, 2000),
+    })
+
+
+def test_compact_frame_dtypes(people):
+    compacted, before, after = compact_frame(people)
+    assert after < before
+    assert compacted['age'].dtype == np.int8 and compacted['id'].dtype == np.int16
+    assert compacted['big'].dtype == np.int64
+    assert compacted['score'].dtype == np.float64 and compacted['half'].dtype == np.float64
+    assert isinstance(compacted['city'].dtype, pd.CategoricalDtype) and compacted['name'].dtype == object
+    assert compacted['flag'].dtype == bool
+    restored = compacted.drop(columns='city').astype(people.dtypes.drop('city').to_dict())
+    pd.testing.assert_frame_equal(restored, people.drop(columns='city'))
+    assert compacted['city'].astype(object).fillna('').tolist() == people['city'].fillna('').tolist()
+    assert compact_frame(people, arrow_strings=True)[0]['name'].dtype == 'string[pyarrow]'
+
+
+def test_compact_frame_is_idempotent(people):
+    compacted, _, _ = compact_frame(people)
+    again, before, after = compact_frame(compacted)
+    assert before == after and again.dtypes.equals(compacted.dtypes)
+    assert np.shares_memory(again['age'].to_numpy(), compacted['age'].to_numpy())
+
+
+def test_nullable_integers_stay_nullable():
+    series = pd.Series([1, None, 3], dtype='Int64')
+    assert compact_series(series).dtype == 'Int8'
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_filters_on_compacted_frames_match(people, filters):
+    compacted, _, _ = compact_frame(people)
+    vacuum = Vacuum()
+    expected = vacuum.apply_command(people, {'filters': filters})
+    assert vacuum.apply_command(compacted, {'filters': filters}).index.equals(expected.index)
+
+
+def test_scruff_on_compacted_frames_matches(broom, people):
+    options = {'normalize_numeric': True, 'fill_numeric_na': True, 'to_lowercase': True, 'remove_stopwords': True}
+    expected = broom.scruff(people, options)
+    result = broom.scruff(compact_frame(people)[0], options)
+    for column in people.columns:
+        if pd.api.types.is_numeric_dtype(expected[column]) and not pd.api.types.is_bool_dtype(expected[column]):
+            np.testing.assert_allclose(result[column].astype(float), expected[column].astype(float), rtol=1e-12)
+        else:
+            assert result[column].astype(object).tolist() == expected[column].astype(object).tolist(), column
+
+
+@pytest.mark.parametrize('options', [
+    {'replace_values': {'city': {'Paris': 5}}},
+    {'replace_all_values': {'Paris': 5, 'Lyon': ''}},
+])
+def test_replacements_on_categoricals_match_text_columns(broom, people, options):
+    compacted, _, _ = compact_frame(people)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        result = broom.scruff(compacted, options)
+    expected = broom.scruff(people, options)
+    assert result['city'].dtype == object
+    assert result['city'].tolist() == expected['city'].tolist()
+
+
+@pytest.fixture
+def scruffy(tmp_path, monkeypatch, futurama):
+    import streamlit as st
+    from config.config import CONFIG
+    from scruffy import Scruffy
+    from version_control.store import VersionStore
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CONFIG['memory'], 'COMPACT', True)
+    st.session_state.clear()
+    scruffy = Scruffy()
+    st.session_state['dataframe_versions'] = VersionStore(max_resident=0, spill_dir=str(tmp_path))
+    scruffy.version_controller.add_uploaded_file('futurama.csv', futurama)
+    yield scruffy
+    st.session_state.clear()
+
+
+def test_single_and_batch_commands_compact_alike(scruffy):
+    command = {'filename': 'lower.csv', 'scruff': {'to_lowercase': True, 'standardize_columns': True}}
+    batch = scruffy.apply_commands([command])[0]
+    scruffy.version_controller.set_selected_version('futurama.csv')
+    single = scruffy.apply_command(command, df=scruffy.version_controller.get_dataframes()['futurama.csv'])
+    assert isinstance(batch['directed_by'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(batch, single)
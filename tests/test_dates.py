@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+from core import Vacuum
+from core.dates import DateParseCache
+
+
+@pytest.mark.parametrize('values', [
+    ['2020-01-05', '2021-03-04', None, '2019-12-31'],
+    ['3/28/1999', '4/4/1999', '12/31/2003'],
+    ['2020-01-05', '5 March 2021', '2019/12/31 10:00'],
+])
+def test_parse_matches_mixed_format(values):
+    df = pd.DataFrame({'date': values})
+    expected = pd.to_datetime(df['date'], format='mixed')
+    pd.testing.assert_series_equal(DateParseCache().parse(df, 'date', 'v1'), expected)
+
+
+def test_unparseable_column_is_cached_as_none():
+    df = pd.DataFrame({'date': ['soon', 'later']})
+    cache = DateParseCache()
+    assert cache.parse(df, 'date', 'v1') is None
+    assert cache.parse(df, 'date', 'v1') is None
+
+
+def test_cache_is_reused_only_for_the_same_data():
+    cache = DateParseCache()
+    df = pd.DataFrame({'date': ['2020-01-05', '2021-03-04']})
+    parsed = cache.parse(df, 'date', 'v1')
+    assert cache.parse(df.copy(deep=False), 'date', 'v1') is parsed
+    replaced = pd.DataFrame({'date': ['1999-01-01', '2000-01-01']})
+    assert cache.parse(replaced, 'date', 'v1').tolist() == pd.to_datetime(replaced['date']).tolist()
+    cache.invalidate('v1')
+    assert cache.parse(df, 'date', 'v1') is not parsed
+
+
+def test_date_filters_with_a_version_match_without(futurama):
+    vacuum = Vacuum()
+    command = {'filters': {'Air Date': {'op': 'between', 'value': ['2000-01-01', '2003-12-31']}}}
+    expected = futurama[pd.to_datetime(futurama['Air Date'], format='mixed').between('2000-01-01', '2003-12-31')]
+    for _ in range(2):
+        pd.testing.assert_frame_equal(vacuum.apply_command(futurama, command, version='futurama.csv'), expected)
+    pd.testing.assert_frame_equal(Vacuum().apply_command(futurama, command), expected)
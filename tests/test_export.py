@@ -0,0 +1,68 @@
+import gzip
+import os
+import zipfile
+import pandas as pd
+import pytest
+from core import Exporter
+from core.export import EXPORT_FORMATS, export_name, remove_export
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return Exporter(chunk_rows=7, directory=str(tmp_path))
+
+
+def read_export(path, export_format):
+    if export_format == 'csv':
+        return pd.read_csv(path)
+    if export_format == 'csv.gz':
+        return pd.read_csv(path, compression='gzip')
+    if export_format == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_chunked_exports_match_pandas(exporter, futurama, export_format):
+    path = exporter.export(futurama, export_format)
+    assert path.endswith(EXPORT_FORMATS[export_format][0])
+    pd.testing.assert_frame_equal(read_export(path, export_format), futurama)
+    remove_export(path)
+    assert not os.path.exists(path)
+
+
+def test_csv_export_is_byte_identical_to_to_csv(exporter, futurama):
+    path = exporter.export(futurama, 'csv')
+    with open(path, encoding='utf-8') as file:
+        assert file.read() == futurama.to_csv(index=False)
+    with gzip.open(exporter.export(futurama, 'csv.gz'), 'rt', encoding='utf-8') as file:
+        assert file.read() == futurama.to_csv(index=False)
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_empty_frames_keep_their_columns(exporter, futurama, export_format):
+    path = exporter.export(futurama.head(0), export_format)
+    assert list(read_export(path, export_format).columns) == list(futurama.columns)
+
+
+def test_zip_holds_every_version(exporter, futurama, tmp_path):
+    versions = {'futurama.csv': futurama, 'futurama_high.csv': futurama[futurama['U.S Viewers'] > 10]}
+    path = exporter.export_zip(list(versions), versions.__getitem__, 'parquet')
+    with zipfile.ZipFile(path) as zip_file:
+        assert zip_file.namelist() == ['futurama.parquet', 'futurama_high.parquet']
+        for name, df in versions.items():
+            with zip_file.open(export_name(name, 'parquet')) as member:
+                pd.testing.assert_frame_equal(pd.read_parquet(member), df.reset_index(drop=True))
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(path)]
+
+
+def test_failed_exports_leave_no_files(exporter, tmp_path):
+    with pytest.raises(ValueError, match='Unknown export format: xlsx'):
+        exporter.export(pd.DataFrame({'a': [1]}), 'xlsx')
+    assert not os.listdir(tmp_path)
+
+
+def test_export_name():
+    assert export_name('sales.csv', 'parquet') == 'sales.parquet'
+    assert export_name('sales.CSV', 'csv.gz') == 'sales.csv.gz'
+    assert export_name('sales', 'feather') == 'sales.feather'
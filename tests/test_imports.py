@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def modules_after_import(module):
+    code = f'import sys, {module}; print(" ".join(sys.modules))'
+    return set(subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True).stdout.split())
+
+
+@pytest.mark.parametrize('heavy', ['streamlit', 'nltk'])
+def test_core_imports_without_ui_or_nltk(heavy):
+    assert heavy not in modules_after_import('core')
+
+
+@pytest.mark.parametrize('module', ['llm', 'scruffy'])
+def test_requests_is_imported_only_when_a_client_is_created(module):
+    assert 'requests' not in modules_after_import(module)
@@ -0,0 +1,61 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from core import FileLoader
+
+CSV = b''',a,a,empty,price,when,iso,name,flag
+0,1,x,,$5.00,01/02/2020,2020-01-02,Fry,True
+1,2,y,,$1200,03/15/2021,2020-01-03,,False
+2,3,z,,$7.5,12/31/1999,2020-01-04,"Leela, T",True
+'''
+
+
+@pytest.fixture(params=['pyarrow', 'pandas'])
+def loader(request):
+    return FileLoader(engine=request.param, preview_rows=2, sniff=True)
+
+
+def test_sniffed_types_are_converted(loader):
+    types = loader.sniff_types(loader.read_preview(io.BytesIO(CSV), 'csv'))
+    assert types == {'price': 'monetary', 'when': '%m/%d/%Y', 'iso': '%Y-%m-%d'}
+    df = loader.read(io.BytesIO(CSV), 'csv', types)
+    assert df['price'].tolist() == [5.0, 1200.0, 7.5]
+    assert df['when'].tolist() == list(pd.to_datetime(['2020-01-02', '2021-03-15', '1999-12-31']))
+    assert df['empty'].dtype == np.float64 and df['empty'].isna().all()
+
+
+def test_csv_columns_match_pandas(loader):
+    df = loader.read(io.BytesIO(CSV), 'csv')
+    expected = pd.read_csv(io.BytesIO(CSV))
+    assert list(df.columns) == list(expected.columns)
+    for column in ['Unnamed: 0', 'a', 'a.1', 'flag', 'price', 'when']:
+        pd.testing.assert_series_equal(df[column], expected[column])
+    assert df['name'].isna().tolist() == expected['name'].isna().tolist()
+    assert df['name'].dropna().tolist() == expected['name'].dropna().tolist()
+
+
+def test_values_beyond_the_preview_keep_text_columns(loader):
+    csv = 'p\n' + '$5\n' * 10 + 'call us\n'
+    types = loader.sniff_types(loader.read_preview(io.StringIO(csv), 'csv'))
+    assert types == {'p': 'monetary'}
+    assert loader.read(io.BytesIO(csv.encode()), 'csv', types)['p'].dtype == object
+
+
+@pytest.mark.parametrize('file_type', ['parquet', 'feather', 'jsonl'])
+def test_other_file_types_round_trip(loader, futurama, file_type):
+    buffer = io.BytesIO()
+    if file_type == 'parquet':
+        futurama.to_parquet(buffer)
+    elif file_type == 'feather':
+        futurama.to_feather(buffer)
+    else:
+        futurama.to_json(buffer, orient='records', lines=True)
+    pd.testing.assert_frame_equal(loader.read_preview(buffer, file_type), futurama.head(2))
+    pd.testing.assert_frame_equal(loader.read(buffer, file_type), futurama)
+
+
+def test_file_type():
+    assert FileLoader.file_type('Sales.CSV') == 'csv'
+    with pytest.raises(ValueError, match='Unsupported file type: xlsx'):
+        FileLoader.file_type('sales.xlsx')
@@ -0,0 +1,23 @@
+import pytest
+from llm import BACKENDS, LLMBackend, LlamaCppBackend, create_backend
+
+
+def test_backend_without_from_config_cannot_be_created():
+    class Incomplete(LLMBackend):
+        name = 'incomplete'
+    with pytest.raises(TypeError):
+        Incomplete('http://localhost', 'model')
+
+
+def test_llamacpp_payload_carries_the_grammar():
+    backend = create_backend('llamacpp', 'root ::= "[]"')
+    assert isinstance(backend, LlamaCppBackend) and backend.enforces_grammar
+    payload = backend.prepare({'messages': [], 'repetition_penalty': 1.1})
+    assert payload['grammar'] == 'root ::= "[]"'
+    assert payload['repeat_penalty'] == 1.1 and 'repetition_penalty' not in payload
+    assert payload['model'] == backend.model
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match='Expected one of: ' + ', '.join(BACKENDS)):
+        create_backend('missing', '')
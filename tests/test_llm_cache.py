@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from llm import ResponseCache, response_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / 'responses.sqlite'), ttl_seconds=3600, max_bytes=2 ** 20)
+
+
+def test_response_key_ignores_key_order():
+    payload = {'model': 'm', 'messages': [{'role': 'user', 'content': 'hi'}], 'temperature': 0.2}
+    assert response_key(payload) == response_key(dict(reversed(payload.items())))
+    assert response_key(payload) != response_key({**payload, 'temperature': 0.3})
+
+
+def test_responses_persist_and_are_not_shared(tmp_path, cache):
+    commands = [{'filename': 'a.csv', 'filters': {'x': {'op': '>', 'value': 1}}}]
+    cache.put('k', commands)
+    cached = cache.get('k')
+    cached[0]['filename'] = 'changed.csv'
+    assert cache.get('k') == commands
+    assert ResponseCache(cache.path).get('k') == commands
+    assert cache.get('missing') is None
+
+
+def test_expired_responses_are_ignored(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), ttl_seconds=0.05)
+    cache.put('k', [1])
+    time.sleep(0.1)
+    assert cache.get('k') is None
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), max_bytes=250)
+    for key in ('a', 'b'):
+        cache.put(key, ['x' * 100])
+        time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.put('c', ['x' * 100])
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.get('b') is None
+
+
+def test_concurrent_requests_share_one_call(cache):
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return [{'filename': 'a.csv'}]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get_or_compute, 'k', compute) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert results == [[{'filename': 'a.csv'}]] * 4
+    assert results[0] is not results[1]
+
+
+def test_failed_calls_are_not_cached(cache):
+    def fail():
+        raise ValueError('API command failed: 500')
+    with pytest.raises(ValueError):
+        cache.get_or_compute('k', fail)
+    assert cache.get('k') is None
+    assert cache.get_or_compute('k', lambda: [1]) == [1]
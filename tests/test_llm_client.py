@@ -0,0 +1,31 @@
+import json
+import pytest
+from llm import CommandStream, LLMClient, parse_commands
+
+COMMANDS = [
+    {'filename': 'high.csv', 'filters': {'U.S Viewers': {'op': '>', 'value': 10}}},
+    {'filename': 'lower.csv', 'scruff': {'to_lowercase': True}},
+]
+CONTENT = json.dumps(COMMANDS, indent=2)
+
+
+def test_complete_retries_unavailable_responses(mock_llm):
+    client = LLMClient(mock_llm(CONTENT, fail_first=2), 'key', retries=3, backoff=0)
+    assert parse_commands(client.complete({'model': 'm', 'messages': []})) == COMMANDS
+    client.close()
+
+
+def test_complete_gives_up_after_the_retries(mock_llm):
+    client = LLMClient(mock_llm(CONTENT, fail_first=5), 'key', retries=1, backoff=0)
+    with pytest.raises(ValueError, match='API command failed: 503'):
+        client.complete({'model': 'm', 'messages': []})
+    client.close()
+
+
+def test_stream_parses_commands_as_they_arrive(mock_llm):
+    client = LLMClient(mock_llm(CONTENT, fail_first=1), 'key', retries=2, backoff=0)
+    stream = CommandStream(client.stream({'model': 'm', 'messages': []}))
+    parsed_counts = [len(stream.commands) for _ in stream]
+    assert stream.text == CONTENT and stream.commands == COMMANDS
+    assert parsed_counts[0] == 0 and 1 in parsed_counts
+    client.close()
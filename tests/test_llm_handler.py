@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import pandas as pd
+import pytest
+import requests
+from llm import LlamaCppBackend, ResponseCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def make_handler(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    from scruffy import LLMHandler
+
+    def make(api_url='http://127.0.0.1:9/v1/chat/completions'):
+        handler = LLMHandler(backend=LlamaCppBackend(api_url, 'model', 'root ::= "[]"'))
+        handler.response_cache = ResponseCache(str(tmp_path / 'responses.sqlite'))
+        return handler
+    return make
+
+
+def test_prompt_context_is_cached_by_fingerprint(make_handler, futurama):
+    handler = make_handler()
+    handler.update_system_prompt_with_df(futurama)
+    prompt = handler.system_prompt
+    assert 'Column Value Examples' in prompt and 'Episode Title' in prompt
+    handler.update_system_prompt_with_df(futurama.copy())
+    assert handler.system_prompt == prompt and len(handler._df_contexts) == 1
+    other = make_handler()
+    other.update_system_prompt_with_df(futurama)
+    assert other.system_prompt == prompt
+
+
+def test_only_changed_columns_are_resampled(make_handler, futurama):
+    handler = make_handler()
+    sampled = []
+    sample_values = handler._sample_values
+
+    def counting_sample(series, max_samples, fingerprint):
+        sampled.append(series.name)
+        return sample_values(series, max_samples, fingerprint)
+    handler._sample_values = counting_sample
+    handler.update_system_prompt_with_df(futurama)
+    assert sampled == list(futurama.columns)
+    sampled.clear()
+    handler.update_system_prompt_with_df(futurama.assign(**{'Directed By': futurama['Directed By'].str.upper()}))
+    assert sampled == ['Directed By']
+
+
+def test_samples_are_distinct_values_of_the_column(make_handler):
+    handler = make_handler()
+    series = pd.Series(['a', 'b', None, 'a', 'c', 'd', 'e', 'f', 'g'] * 3, name='letters')
+    context = handler.get_column_context(series.to_frame(), max_samples=5)
+    assert len(context['letters']) == 5 and len(set(context['letters'])) == 5
+    assert set(context['letters']) <= set(series.dropna())
+
+
+def test_unhashable_columns_render_without_caching(make_handler):
+    handler = make_handler()
+    df = pd.DataFrame({'tags': [['a', 'b'], None, ['c']], 'name': ['x', 'y', 'x']})
+    handler.update_system_prompt_with_df(df)
+    assert "tags: [['a', 'b'], ['c']]" in handler.system_prompt
+    assert "name: ['x', 'y']" in handler.system_prompt or "name: ['y', 'x']" in handler.system_prompt
+    assert not handler._df_contexts and len(handler._column_samples) == 1
+
+
+COMMANDS = [{'filename': 'high.csv', 'filters': {'U.S Viewers': {'op': '>', 'value': 10}}}]
+
+
+def tracking_complete(handler, fail_on=None, delay=0.05):
+    '''Wraps the backend's complete to record the instructions sent and the peak concurrency.'''
+    calls, active, lock = [], [0, 0], threading.Lock()
+    complete = handler.backend.complete
+
+    def tracked(payload, timeout=None):
+        instruction = payload['messages'][-1]['content']
+        with lock:
+            calls.append(instruction)
+            active[0] += 1
+            active[1] = max(active)
+        try:
+            time.sleep(delay)
+            if instruction == fail_on:
+                raise ValueError('API command failed: 500')
+            return complete(payload, timeout)
+        finally:
+            with lock:
+                active[0] -= 1
+    handler.backend.complete = tracked
+    return calls, active
+
+
+def test_generate_responses_in_order_with_failures(make_handler, mock_llm):
+    handler = make_handler(mock_llm(json.dumps(COMMANDS)))
+    calls, active = tracking_complete(handler, fail_on='bad')
+    instructions = ['one', 'bad', 'two', 'three', 'one']
+    results = handler.generate_responses(instructions, concurrency=2, timeout=10)
+    assert results[0] == results[2] == results[3] == results[4] == COMMANDS
+    assert isinstance(results[1], ValueError)
+    assert sorted(calls) == ['bad', 'one', 'three', 'two'] and active[1] == 2
+
+
+def test_generate_responses_times_out(make_handler, mock_llm):
+    handler = make_handler(mock_llm(json.dumps(COMMANDS), latency=4))
+    calls, active = tracking_complete(handler, delay=0)
+    start = time.perf_counter()
+    results = handler.generate_responses(['one', 'two', 'three'], concurrency=1, timeout=0.2, use_cache=False)
+    elapsed = time.perf_counter() - start
+    # The client's read timeout usually loses the race with the asyncio one, but may win it.
+    assert all(isinstance(result, (asyncio.TimeoutError, requests.Timeout)) for result in results)
+    assert len(calls) == 3 and active[1] == 1
+    assert elapsed < 1.5
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from core import ResultCache
+from core.fingerprint import command_hash, fingerprint_frame
+from version_control.store import VersionStore
+
+
+def test_command_hash_ignores_the_output_name():
+    command = {'filename': 'a.csv', 'filters': {'x': {'op': '>', 'value': 1}}, 'scruff': {'to_lowercase': True}}
+    assert command_hash(command) == command_hash({**command, 'filename': 'b.csv', 'description': 'renamed'})
+    assert command_hash(command) != command_hash({**command, 'scruff': {'to_lowercase': False}})
+
+
+def test_fingerprint_follows_content(tmp_path, futurama):
+    store = VersionStore(max_resident=0, spill_dir=str(tmp_path))
+    store.add('a', futurama)
+    store.add('b', futurama.copy())
+    store.add('c', futurama.assign(**{'U.S Viewers': futurama['U.S Viewers'] + 1}), parent='a')
+    assert store.fingerprint('a') == store.fingerprint('b') == fingerprint_frame(futurama)
+    assert store.fingerprint('c') != store.fingerprint('a')
+
+
+def test_results_are_isolated_and_evicted_by_size(futurama):
+    cache = ResultCache(max_bytes=int(futurama.memory_usage(deep=True).sum() * 1.5), directory=None)
+    cache.put('a', futurama)
+    result = cache.get('a')
+    result['U.S Viewers'] = 0.0
+    pd.testing.assert_frame_equal(cache.get('a'), futurama)
+    cache.put('b', futurama.head(40))
+    cache.put('c', futurama.head(40))
+    assert cache.get('a') is None
+    assert cache.get('b') is not None and cache.get('c') is not None
+    assert cache.get('missing') is None
+
+
+@pytest.mark.parametrize('max_disk_bytes', [2 ** 30, 0])
+def test_persisted_results_survive_new_caches(tmp_path, futurama, max_disk_bytes):
+    ResultCache(directory=str(tmp_path), max_disk_bytes=max_disk_bytes).put('a', futurama)
+    result = ResultCache(directory=str(tmp_path)).get('a')
+    if max_disk_bytes:
+        pd.testing.assert_frame_equal(result, futurama)
+    else:
+        assert result is None and not list(tmp_path.iterdir())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.stats import OnlineStats, robust_bounds
+
+
+def chunked_stats(series, chunk_rows, quantiles=True):
+    stats = OnlineStats(quantiles=quantiles)
+    for start in range(0, len(series), chunk_rows):
+        stats.update(series.iloc[start:start + chunk_rows])
+    return stats
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 97, 10000])
+def test_moments_match_pandas(chunk_rows):
+    series = pd.Series(np.random.default_rng(0).normal(5, 3, 5000))
+    series[::17] = np.nan
+    stats = chunked_stats(series, chunk_rows)
+    assert stats.count == series.count() and stats.na_count == series.isna().sum()
+    assert stats.mean == pytest.approx(series.mean(), rel=1e-12)
+    assert stats.std == pytest.approx(series.std(), rel=1e-12)
+    assert (stats.min, stats.max) == (series.min(), series.max())
+
+
+def test_quantiles_are_exact_for_few_distinct_values():
+    series = pd.Series(np.random.default_rng(1).integers(0, 300, 20000).astype(float))
+    stats = chunked_stats(series, 1000)
+    for q in (0.25, 0.5, 0.75):
+        assert stats.quantile(q) == series.quantile(q)
+    assert stats.mad() == (series - series.median()).abs().median()
+
+
+def test_quantiles_are_close_for_many_distinct_values():
+    series = pd.Series(np.random.default_rng(2).normal(0, 1, 50000))
+    stats = chunked_stats(series, 4096)
+    for q in (0.25, 0.5, 0.75):
+        assert abs((series <= stats.quantile(q)).mean() - q) < 0.002
+
+
+def test_merged_partitions_match_one_pass():
+    series = pd.Series(np.random.default_rng(3).integers(0, 50, 3000).astype(float))
+    merged = chunked_stats(series.iloc[:1000], 100)
+    merged.merge(chunked_stats(series.iloc[1000:], 300))
+    whole = chunked_stats(series, 3000)
+    assert merged.mean == pytest.approx(whole.mean) and merged.std == pytest.approx(whole.std)
+    assert merged.median == whole.median
+
+
+def test_robust_bounds():
+    assert robust_bounds('iqr', 1.0, 2.0, 3.0, 0.5, iqr_multiplier=1.5) == (-2.0, 6.0)
+    low, high = robust_bounds('mad', 1.0, 2.0, 3.0, 0.5, threshold=2.0)
+    assert (low, high) == pytest.approx((2.0 - 1.4826, 2.0 + 1.4826))
+    with pytest.raises(ValueError, match='Unknown outlier method'):
+        robust_bounds('zscore', 1.0, 2.0, 3.0, 0.5)
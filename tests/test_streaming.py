@@ -0,0 +1,74 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from core import Broom, ChunkedRunner, Vacuum
+
+COMMANDS = [
+    {'filters': {'count': {'op': '>=', 'value': 5}}},
+    {
+        'filters': {'OR': [{'label': {'op': 'contains', 'value': 'dog'}}, {'date': {'op': '>', 'value': '2020-06-01'}}]},
+        'scruff': {'standardize_columns': True, 'drop_duplicate_rows': True, 'to_lowercase': True, 'drop_empty_columns': True},
+    },
+    {'scruff': {'fill_numeric_na': True, 'fill_method': 'mean', 'normalize_numeric': True, 'drop_duplicate_rows': True}},
+    {'scruff': {'fill_numeric_na': True, 'fill_method': 'forward', 'normalize_numeric': True}},
+    {'scruff': {'fill_numeric_na': True, 'fill_method': 'zero', 'drop_na_threshold': 10, 'excluded_columns': ['count']}},
+    {'scruff': {'fill_numeric_na': True, 'replace_values': {'label': {'Dogs': 'canine'}}, 'numeric_conversion': 'Int to Float'}},
+]
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'score': rng.normal(50, 10, 1000).round(3),
+        'count': rng.integers(0, 20, 1000),
+        'maybe': np.where(rng.random(1000) < 0.2, np.nan, rng.normal(0, 1, 1000)),
+        'label': rng.choice(['Foo Bar', 'the cats', 'Dogs', None], 1000),
+        'empty': np.nan,
+        'date': rng.choice(['2020-01-05', '2021-03-04', '2019-12-31'], 1000),
+    })
+    path = tmp_path / 'input.csv'
+    pd.concat([df, df.iloc[:150]]).to_csv(path, index=False)
+    return path
+
+
+def round_trip(df):
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+
+def run_in_memory(input_path, command):
+    df = pd.read_csv(input_path)
+    if command.get('filters'):
+        df = Vacuum().apply_command(df, command)
+    if command.get('scruff'):
+        df = Broom(parallel=False, numeric_engine='sequential').scruff(df, command['scruff'])
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize('chunksize', [7, 333, 100000])
+@pytest.mark.parametrize('command', COMMANDS)
+def test_streaming_matches_in_memory(tmp_path, input_path, command, chunksize):
+    output_path = tmp_path / 'output.csv'
+    runner = ChunkedRunner(broom=Broom(parallel=False), chunksize=chunksize)
+    row_count = runner.run_command(input_path, command, output_path)
+    expected = run_in_memory(input_path, command)
+    result = pd.read_csv(output_path)
+    assert row_count == len(expected)
+    pd.testing.assert_frame_equal(result, round_trip(expected), rtol=1e-9)
+
+
+def test_streaming_removes_outliers_with_one_mask(tmp_path):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'x': rng.normal(0, 1, 1000), 'y': rng.normal(5, 2, 1000), 'label': rng.choice(['a', 'b'], 1000)})
+    df.loc[[3, 500], 'x'] = [9.0, -12.0]
+    df.loc[[7, 501], 'y'] = [40.0, -30.0]
+    input_path, output_path = tmp_path / 'input.csv', tmp_path / 'output.csv'
+    df.to_csv(input_path, index=False)
+    command = {'scruff': {'handle_outliers': True, 'z_score_threshold': 3.0}}
+    row_count = ChunkedRunner(broom=Broom(parallel=False), chunksize=100).run_command(input_path, command, output_path)
+    numeric = df[['x', 'y']]
+    z_scores = ((numeric - numeric.mean()) / numeric.std()).abs()
+    expected = df[(z_scores < 3.0).all(axis=1)].reset_index(drop=True)
+    assert 0 < row_count == len(expected) <= len(df) - 4
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), round_trip(expected))
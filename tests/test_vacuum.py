@@ -0,0 +1,127 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from core import Vacuum
+
+LOGICAL_OPS = ('AND', 'OR', 'XOR')
+
+
+@pytest.fixture(scope='module')
+def events():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'a': rng.integers(0, 100, 3000),
+        'b': rng.normal(0, 1, 3000),
+        'c': rng.choice(['x', 'y', 'zeta', None], 3000),
+        'event date': rng.choice(['2020-01-05', '2021-03-04', '2019-12-31', None], 3000),
+        'd': rng.integers(0, 5, 3000),
+    })
+
+
+def reference_condition(df, column, condition):
+    '''A condition evaluated directly with pandas, as Vacuum did before filter plans.'''
+    series, value, op = df[column], condition.get('value'), condition['op']
+    if 'date' in column:
+        series, value = pd.to_datetime(series, format='mixed'), pd.to_datetime(value)
+    if op == 'isna':
+        return series.isna()
+    if op == 'notna':
+        return series.notna()
+    if op == 'in':
+        return series.isin(value)
+    if op == 'not in':
+        return ~series.isin(value)
+    if op == 'between':
+        return series.between(value[0], value[1])
+    if op == 'contains':
+        return series.str.contains(value, case=False, na=False)
+    return {'==': series.__eq__, '!=': series.__ne__, '<': series.__lt__, '<=': series.__le__,
+            '>': series.__gt__, '>=': series.__ge__}[op](value)
+
+
+def reference_mask(df, filters):
+    masks = []
+    for key, condition in filters.items():
+        if key in LOGICAL_OPS:
+            children = pd.concat([reference_mask(df, child) for child in condition], axis=1)
+            masks.append(
+                children.any(axis=1) if key == 'OR'
+                else children.sum(axis=1) == 1 if key == 'XOR'
+                else children.all(axis=1)
+            )
+        else:
+            masks.append(reference_condition(df, key, condition))
+    return pd.concat(masks, axis=1).all(axis=1)
+
+
+def random_leaf(rng):
+    column = rng.choice(['a', 'b', 'c', 'event date', 'd'])
+    if column in ('a', 'd'):
+        op = rng.choice(['==', '!=', '<', '<=', '>', '>=', 'in', 'not in', 'between', 'isna', 'notna'])
+        value = {'in': [1, 2, 3], 'not in': [1, 2], 'between': [10, 60]}.get(op, rng.randint(0, 99))
+    elif column == 'b':
+        op = rng.choice(['<', '>', 'between', 'notna'])
+        value = [-1, 1] if op == 'between' else rng.uniform(-2, 2)
+    elif column == 'c':
+        op = rng.choice(['==', '!=', 'contains', 'in', 'isna'])
+        value = {'contains': 'E', 'in': ['x', 'y']}.get(op, 'x')
+    else:
+        op = rng.choice(['>', '<', 'between', 'notna'])
+        value = ['2020-01-01', '2021-01-01'] if op == 'between' else '2020-06-01'
+    condition = {'op': op} if op in ('isna', 'notna') else {'op': op, 'value': value}
+    return {column: condition}
+
+
+def random_filters(rng, depth):
+    if depth == 0 or rng.random() < 0.3:
+        leaves = [random_leaf(rng) for _ in range(rng.randint(1, 3))]
+        return {column: condition for leaf in leaves for column, condition in leaf.items()}
+    return {rng.choice(LOGICAL_OPS): [random_filters(rng, depth - 1) for _ in range(rng.randint(1, 4))]}
+
+
+def filter_cases(count, seed):
+    rng = random.Random(seed)
+    return [random_filters(rng, 4) for _ in range(count)]
+
+
+@pytest.mark.parametrize('short_circuit', [False, True])
+@pytest.mark.parametrize('filters', filter_cases(100, 0))
+def test_filter_plan_matches_reference(events, filters, short_circuit):
+    vacuum = Vacuum(short_circuit=short_circuit)
+    expected = reference_mask(events, filters)
+    for _ in range(2):
+        mask = vacuum.build_mask(events, filters)
+        assert mask.index.equals(events.index)
+        assert np.array_equal(mask.to_numpy(dtype=bool), expected.to_numpy(dtype=bool))
+
+
+def test_short_circuit_skips_rows_already_decided(events):
+    evaluated = []
+    vacuum = Vacuum(short_circuit=True)
+    evaluate_condition = vacuum.evaluate_condition
+
+    def counting_condition(df, column, condition, rows=None, version=None):
+        evaluated.append((column, len(df) if rows is None else len(rows)))
+        return evaluate_condition(df, column, condition, rows=rows, version=version)
+    vacuum.evaluate_condition = counting_condition
+    filters = {'AND': [{'d': {'op': '==', 'value': 0}}, {'c': {'op': 'contains', 'value': 'e'}}]}
+    mask = vacuum.build_mask(events, filters)
+    assert np.array_equal(mask.to_numpy(dtype=bool), reference_mask(events, filters).to_numpy(dtype=bool))
+    assert evaluated == [('d', len(events)), ('c', int((events['d'] == 0).sum()))]
+
+
+def test_compiled_plans_are_reused():
+    vacuum = Vacuum()
+    filters = {'OR': [{'a': {'op': '>', 'value': 5}}, {'c': {'op': '==', 'value': 'x'}}]}
+    assert vacuum.compile_filters(filters) is vacuum.compile_filters({'OR': list(filters['OR'])})
+
+
+@pytest.mark.parametrize('filters, message', [
+    ({'missing': {'op': '==', 'value': 1}}, 'Column "missing" not found'),
+    ({'a': {'op': 'like', 'value': 1}}, 'Unsupported operation "like"'),
+    ({'a': {'op': '=='}}, 'Missing value for operation "=="'),
+])
+def test_invalid_filters(events, filters, message):
+    with pytest.raises(ValueError, match=message):
+        Vacuum().build_mask(events, filters)
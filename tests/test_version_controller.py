@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+import streamlit as st
+from version_control.controller import VersionController
+from version_control.store import VersionStore
+
+
+@pytest.fixture
+def controller(tmp_path):
+    st.session_state.clear()
+    controller = VersionController()
+    controller.load_from_session()
+    st.session_state['dataframe_versions'] = VersionStore(max_resident=0, spill_dir=str(tmp_path), checkpoint_every=0)
+    yield controller
+    st.session_state.clear()
+
+
+def test_undo_and_redo_after_overwrite(controller, futurama):
+    controller.add_uploaded_file('futurama.csv', futurama)
+    high = futurama[futurama['U.S Viewers'] > 10]
+    high = high.set_axis(range(1000, 1000 + len(high)))  # not a row subset, so it is stored whole
+    controller.add_version('high.csv', high, rerun=False, parent='futurama.csv')
+    controller.add_version('high.csv', futurama.head(3), rerun=False, parent='futurama.csv')
+    controller.add_version('low.csv', futurama.tail(3), rerun=False, parent='futurama.csv')
+    versions = controller.get_dataframes()
+    assert list(versions) == ['futurama.csv', 'futurama_high.csv', 'futurama_low.csv']
+
+    assert controller.undo()
+    assert 'futurama_low.csv' not in versions
+    assert controller.undo()
+    pd.testing.assert_frame_equal(versions['futurama_high.csv'], high)
+    assert controller.get_selected_version() == 'futurama_high.csv'
+    assert controller.undo()
+    assert 'futurama_high.csv' not in versions
+    assert controller.get_selected_version() == 'futurama.csv'
+    assert not controller.undo()
+
+    assert controller.redo() and controller.redo()
+    pd.testing.assert_frame_equal(versions['futurama_high.csv'], futurama.head(3))
+    assert controller.redo()
+    pd.testing.assert_frame_equal(versions['futurama_low.csv'], futurama.tail(3))
+    assert not controller.redo()
+
+
+def test_new_version_clears_redo(controller, futurama):
+    controller.add_uploaded_file('futurama.csv', futurama)
+    controller.add_version('a.csv', futurama.head(2), rerun=False, parent='futurama.csv')
+    controller.undo()
+    assert controller.can_redo()
+    controller.add_version('b.csv', futurama.head(4), rerun=False, parent='futurama.csv')
+    assert not controller.can_redo()
+
+
+@pytest.mark.parametrize('remove_all', [False, True])
+def test_undo_and_redo_after_remove(controller, futurama, remove_all):
+    controller.add_uploaded_file('futurama.csv', futurama)
+    rewritten = futurama.astype(str) + '!'  # every column rewritten, so it is stored whole
+    controller.add_version('text.csv', rewritten, rerun=False, parent='futurama.csv')
+    controller.add_version('head.csv', futurama.head(3), rerun=False, parent='futurama.csv')
+    removed = ['futurama_head.csv', 'futurama_text.csv'] if remove_all else ['futurama_text.csv']
+    controller.remove_versions(removed, 'cannot remove', 'last version', rerun=False)
+    versions = controller.get_dataframes()
+    assert all(name not in versions for name in removed)
+
+    assert controller.undo()
+    assert controller.redo()
+    pd.testing.assert_frame_equal(versions['futurama_head.csv'], futurama.head(3))
+    assert controller.undo() and controller.undo()
+    assert controller.redo()
+    pd.testing.assert_frame_equal(versions['futurama_text.csv'], rewritten)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+from version_control.store import VersionStore
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'id': np.arange(6),
+        'score': [0.5, 1.5, np.nan, 3.5, 4.5, 5.5],
+        'name': ['a', 'b', 'c', None, 'e', 'f'],
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VersionStore(max_resident=0, spill_dir=str(tmp_path), checkpoint_every=0)
+
+
+def test_returned_frames_are_isolated(store, frame):
+    store['v1'] = frame
+    loaded = store['v1']
+    loaded['score'] = 0.0
+    loaded.loc[0, 'name'] = 'changed'
+    pd.testing.assert_frame_equal(store['v1'], frame)
+    frame.loc[1, 'name'] = 'changed'
+    assert store['v1'].loc[1, 'name'] == 'b'
+
+
+def test_unchanged_columns_are_shared(store, frame):
+    store['v1'] = frame
+    store['v2'] = frame.assign(score=frame['score'] * 2)
+    assert np.shares_memory(store['v1']['id'].to_numpy(), store['v2']['id'].to_numpy())
+    assert not np.shares_memory(store['v1']['score'].to_numpy(), store['v2']['score'].to_numpy())
+    pd.testing.assert_frame_equal(store['v2'], frame.assign(score=frame['score'] * 2))
+
+
+def test_mapping_interface(store, frame):
+    store['v1'] = frame
+    store['v2'] = frame.head(2)
+    assert list(store) == ['v1', 'v2'] and len(store) == 2 and 'v2' in store
+    del store['v1']
+    assert list(store) == ['v2']
+    with pytest.raises(KeyError):
+        store['v1']
+
+
+@pytest.fixture
+def spilling_store(tmp_path):
+    return VersionStore(max_resident=1, spill_dir=str(tmp_path), checkpoint_every=0)
+
+
+def test_evicted_versions_are_spilled_and_read_back(spilling_store, frame, tmp_path):
+    typed = frame.assign(
+        label=pd.Categorical(['x', 'y', 'x', None, 'y', 'x']),
+        text=pd.Series(['p', None, 'q', 'r', 's', 't'], dtype='string'),
+        count=pd.array([1, None, 3, 4, 5, 6], dtype='Int64'),
+        when=pd.to_datetime(['2020-01-01', None, '2021-03-04', '2019-12-31', '2020-06-01', '2022-02-02']),
+    )
+    spilling_store['v1'] = typed
+    spilling_store['v2'] = frame
+    assert not spilling_store.is_resident('v1')
+    assert list(tmp_path.rglob('*.arrow'))
+    pd.testing.assert_frame_equal(spilling_store['v1'], typed)
+    assert spilling_store.is_resident('v1') and not spilling_store.is_resident('v2')
+    pd.testing.assert_frame_equal(spilling_store.load('v2'), frame)
+    assert not spilling_store.is_resident('v2')
+
+
+def test_frames_arrow_cannot_store_stay_resident(spilling_store, frame):
+    mixed = pd.DataFrame({'value': [1, 'a', 2.5, None, b'x', (1, 2)]})
+    spilling_store['mixed'] = mixed
+    spilling_store['v2'] = frame
+    assert spilling_store.is_resident('mixed')
+    pd.testing.assert_frame_equal(spilling_store['mixed'], mixed)
+
+
+def test_removed_versions_delete_their_spill_files(spilling_store, frame, tmp_path):
+    spilling_store['v1'] = frame
+    spilling_store['v2'] = frame.head(3)
+    assert len(list(tmp_path.rglob('*.arrow'))) == 1
+    del spilling_store['v1']
+    assert not list(tmp_path.rglob('*.arrow'))
+
+
+@pytest.mark.parametrize('make_child, kind', [
+    (lambda df: df[df['id'] % 2 == 0], 'rows'),
+    (lambda df: df.assign(score=df['score'].fillna(0)), 'columns'),
+    (lambda df: df[df['id'] > 1].assign(name=df['name'].str.upper()), 'rows+columns'),
+    (lambda df: df.rename(columns={'score': 'points'}).assign(points=lambda x: x['points'] * 2), 'columns'),
+])
+def test_versions_are_stored_as_deltas(spilling_store, frame, make_child, kind):
+    child = make_child(frame)
+    spilling_store.add('root', frame)
+    spilling_store.add('child', child, parent='root')
+    spilling_store.add('other', frame.head(1))
+    node = spilling_store.node('child')
+    assert not node.is_snapshot and node.kind == kind
+    assert not spilling_store.is_resident('child') and not spilling_store.is_resident('root')
+    pd.testing.assert_frame_equal(spilling_store['child'], child)
+    assert [step['name'] for step in spilling_store.lineage('child')] == ['root', 'child']
+
+
+def test_unrelated_version_is_stored_whole_with_its_parent(store, frame):
+    store.add('root', frame)
+    replaced = pd.DataFrame({'other': [1, 2, 3]}, index=[10, 11, 12])
+    store.add('child', replaced, parent='root', command={'scruff': {'drop_empty_columns': True}})
+    node = store.node('child')
+    assert node.is_snapshot and node.parent is store.node('root')
+    step = store.lineage('child')[-1]
+    assert step['checkpoint'] and step['command'] == {'scruff': {'drop_empty_columns': True}}
+    pd.testing.assert_frame_equal(store['child'], replaced)
+
+
+def test_deep_chains_are_checkpointed(tmp_path, frame):
+    store = VersionStore(max_resident=1, spill_dir=str(tmp_path), checkpoint_every=3)
+    store.add('v0', frame)
+    expected = frame
+    for step in range(1, 8):
+        expected = expected.assign(score=expected['score'] + 1)
+        store.add(f'v{step}', expected, parent=f'v{step - 1}')
+        assert store.node(f'v{step}').depth < 3
+    pd.testing.assert_frame_equal(store['v7'], expected)
+    assert len(store.lineage('v7')) == 8
+
+
+def test_children_outlive_their_overwritten_or_removed_parent(spilling_store, frame):
+    spilling_store.add('root', frame)
+    spilling_store.add('child', frame[frame['id'] > 2], parent='root')
+    spilling_store.add('root', frame.head(1))
+    del spilling_store['root']
+    spilling_store.add('other', frame.tail(1))
+    pd.testing.assert_frame_equal(spilling_store['child'], frame[frame['id'] > 2])
+
+
+def test_restore_after_overwrite(spilling_store, frame):
+    spilling_store.add('root', frame)
+    spilling_store.add('result', frame.assign(score=0.0), parent='root')
+    overwritten = spilling_store.node('result')
+    spilling_store.add('result', pd.DataFrame({'x': [1]}))
+    spilling_store.add('other', frame.tail(2), parent='root')
+    spilling_store.add('another', frame.tail(3))
+    spilling_store.restore('result', overwritten)
+    pd.testing.assert_frame_equal(spilling_store['result'], frame.assign(score=0.0))
+
+
+def test_restore_of_an_overwritten_snapshot(spilling_store, frame):
+    spilling_store.add('result', frame)
+    overwritten = spilling_store.node('result')
+    spilling_store.add('result', frame.head(1))
+    spilling_store.add('other', frame.tail(2))
+    spilling_store.restore('result', overwritten)
+    pd.testing.assert_frame_equal(spilling_store['result'], frame)
+
+
+def test_restore_none_removes_the_version(store, frame):
+    store.add('root', frame)
+    store.add('child', frame.head(2), parent='root')
+    node = store.node('child')
+    store.restore('child', None)
+    assert 'child' not in store
+    store.restore('child', node)
+    pd.testing.assert_frame_equal(store['child'], frame.head(2))
@@ -358,12 +358,6 @@ def render_command_sidebar():
                                 st.session_state['result_df'] = results
                                 st.session_state['counts'] = counts
                                 st.session_state['commands_executed'] = True
-                                if len(results) > 0:
-                                    last_result = results[-1]
-                                    st.session_state['df'] = last_result
-                                    version_name = st.session_state['commands'][-1].get('filename', 'last_command.csv')
-                                    st.session_state['dataframe_versions'][version_name] = last_result
-                                    st.session_state['selected_version'] = version_name
 
 
 def edit_commands_ui(df):
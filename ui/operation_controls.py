@@ -1,5 +1,8 @@
+import os
 import streamlit as st
 from config.config import CONFIG
+from core import Exporter
+from core.export import EXPORT_FORMATS, export_name, remove_export
 from ui.views import ComponentRegistry
 import pandas as pd
 
@@ -47,9 +50,16 @@ def render_versioning_buttons():
     versions = list(vc.get_dataframes().keys())
     if versions:
         selected_version = st.session_state['selected_version'] if 'selected_version' in st.session_state and st.session_state['selected_version'] in versions else versions[0]
-        current_df = vc.get_dataframes()[selected_version]
         version_key = selected_version.replace('.', '_').replace(' ', '_')
 
+        if st.button('↩️ Undo', key=f'undo_{version_key}', disabled=not vc.can_undo()):
+            st.session_state['scruffy'].undo()
+            st.rerun()
+
+        if st.button('↪️ Redo', key=f'redo_{version_key}', disabled=not vc.can_redo()):
+            st.session_state['scruffy'].redo()
+            st.rerun()
+
         if st.button('Remove Current Version', key=f'remove_current_{version_key}'):
             vc.remove_versions(
                 [selected_version],
@@ -62,12 +72,20 @@ def render_versioning_buttons():
                     st.session_state['selected_version'] = v[0]
             st.rerun()
 
-        st.download_button(
-            label='Download Current File',
-            data=current_df.to_csv(index=False),
-            file_name=f'{selected_version}.csv',
-            mime='text/csv',
-            key=f'download_current_{version_key}'
+        export_format = st.selectbox(
+            'Download Format:',
+            options=list(EXPORT_FORMATS),
+            index=list(EXPORT_FORMATS).index(CONFIG['export'].DEFAULT_FORMAT),
+            key='export_format'
+        )
+        dataframes = vc.get_dataframes()
+        render_export_button(
+            'Current File',
+            f'current_{version_key}_{export_format}',
+            (dataframes.node(selected_version),),
+            export_name(selected_version, export_format),
+            EXPORT_FORMATS[export_format][1],
+            lambda: Exporter().export(dataframes.load(selected_version), export_format)
         )
 
         if st.button('Remove All Versions', key=f'remove_all_{version_key}'):
@@ -81,13 +99,49 @@ def render_versioning_buttons():
                 st.session_state['selected_version'] = v[0]
             st.rerun()
 
-        zip_buffer = vc.create_zip_of_all_versions()
+        upload_versions = vc.get_versions_for_upload()
+        render_export_button(
+            'All Versions (ZIP)',
+            f'all_{version_key}_{export_format}',
+            tuple(dataframes.node(version) for version in upload_versions),
+            'all_versions.zip',
+            'application/zip',
+            lambda: vc.create_zip_of_all_versions(export_format)
+        )
+
+
+def _discard_export(key):
+    remove_export(st.session_state['exports'].pop(key, (None, None))[1])
+
+
+def render_export_button(label, key, nodes, file_name, mime, build):
+    '''
+    Shows a button that writes the export with build() only when clicked, then a button to
+    download it. The file is removed once downloaded or when any of the version nodes changes.
+    '''
+    exports = st.session_state.setdefault('exports', {})
+    prepared = exports.get(key)
+    if prepared is not None and (prepared[0] != nodes or not os.path.exists(prepared[1])):
+        _discard_export(key)
+        prepared = None
+    if prepared is None:
+        if not st.button(f'Export {label}', key=f'export_{key}'):
+            return
+        try:
+            with st.spinner(f'Exporting {label}...'):
+                prepared = exports[key] = (nodes, build())
+        except Exception as e:
+            st.error(f'Error exporting {label}: {str(e)}')
+            return
+    with open(prepared[1], 'rb') as file:
         st.download_button(
-            label='Download All Versions (ZIP)',
-            data=zip_buffer.getvalue(),
-            file_name='all_versions.zip',
-            mime='application/zip',
-            key=f'download_all_{version_key}'
+            label=f'Download {label}',
+            data=file,
+            file_name=file_name,
+            mime=mime,
+            key=f'download_{key}',
+            on_click=_discard_export,
+            args=(key,)
         )
 
 
@@ -102,11 +156,26 @@ def render_file_info(selected_df):
 
 def render_file_preview(selected_df, version):
     with st.expander('Preview of Selected Version', expanded=False):
-        preview_df = selected_df.copy()
+        preview_df = selected_df.copy(deep=False)
         for col in preview_df.select_dtypes(['object']):
             preview_df[col] = preview_df[col].astype(str)
         st.dataframe(preview_df.head())
 
+def render_version_lineage(version):
+    from version_control.controller import VersionController
+    vc = VersionController()
+    vc.load_from_session()
+    with st.expander('Version Lineage', expanded=False):
+        for step in vc.get_lineage(version):
+            changes = step['kind'] if step['parent'] else 'original'
+            if step['rows'] is not None:
+                changes += f' ({step["rows"]} rows)'
+            if step['changed_columns']:
+                changes += f' - changed: {", ".join(step["changed_columns"])}'
+            st.markdown(f'**{step["name"]}** · {changes} · {step["created"]}')
+            if step['command']:
+                st.json(step['command'], expanded=False)
+
 def render_operation_tabs(selected_df):
     st.markdown('#### Operations')
     tab_keys = list(CONFIG['ui'].TABS.keys())
@@ -138,9 +207,10 @@ def render_operation_controls(df):
             st.session_state['selected_version'] = selected_version
 
     if selected_version in dataframes:
-        selected_df = dataframes[selected_version].copy(deep=True)
+        selected_df = dataframes[selected_version]
         with col1:
             render_file_preview(selected_df, selected_version)
+            render_version_lineage(selected_version)
         with col2:
             render_file_info(selected_df)
         if selected_df is not None:
@@ -37,11 +37,17 @@ class NaturalLanguageView(TabView):
     def render(self):
         st.markdown('### Describe Your Data Manipulation Command')
         user_input = st.text_area('📝 Enter your instructions here:')
+        batch = st.checkbox('Treat each line as a separate instruction', key='nl_batch')
         if st.button('🤖 Generate Commands', key='nl_generate_commands') and user_input.strip():
             def generate_commands():
                 try:
                     scruffy = st.session_state['scruffy']
-                    new_commands = scruffy.llm.generate_response(user_input)
+                    if batch:
+                        new_commands = self._batch_commands(scruffy.llm, user_input)
+                    elif CONFIG['llm'].STREAM:
+                        new_commands = self._stream_commands(scruffy.llm, user_input)
+                    else:
+                        new_commands = scruffy.llm.generate_response(user_input)
                     if st.session_state.get('is_default_template', True):
                         st.session_state['commands'] = new_commands
                         st.session_state['is_default_template'] = False
@@ -54,6 +60,32 @@ class NaturalLanguageView(TabView):
             with st.spinner('Generating commands...'):
                 generate_commands()
 
+    @staticmethod
+    def _stream_commands(llm, user_input):
+        stream = llm.stream_response(user_input)
+        output, status = st.empty(), st.empty()
+        text = ''
+        for chunk in stream:
+            text += chunk
+            output.code(text, language='json')
+            status.caption(f'{len(stream.commands)} command(s) parsed')
+        return stream.commands
+
+    @staticmethod
+    def _batch_commands(llm, user_input):
+        instructions = [line.strip() for line in user_input.splitlines() if line.strip()]
+        new_commands, failures = [], []
+        for instruction, result in zip(instructions, llm.generate_responses(instructions)):
+            if isinstance(result, Exception):
+                failures.append(f'{instruction}: {result or type(result).__name__}')
+            else:
+                new_commands.extend(result)
+        if failures and not new_commands:
+            raise ValueError('; '.join(failures))
+        for failure in failures:
+            st.warning(f'Skipped instruction - {failure}')
+        return new_commands
+
 class FilterBuilderView(TabView):
     def render(self, df=None):
         if df is None:
@@ -281,10 +313,32 @@ class ScruffOptionsView(TabView):
                 value=self.scruff_defaults.NUMERIC_OPTIONS['handle_outliers']
             )
             if options['handle_outliers']:
-                options['z_score_threshold'] = st.slider(
-                    'Z-score threshold for outliers',
-                    1.0, 5.0, self.scruff_defaults.Z_SCORE_THRESHOLD, 0.1
+                options['outlier_method'] = st.selectbox(
+                    'Outlier method',
+                    options=['zscore', 'iqr', 'mad'],
+                    index=['zscore', 'iqr', 'mad'].index(self.scruff_defaults.OUTLIER_METHOD),
+                    help='zscore: distance from the mean in standard deviations. iqr: outside the quartiles by more '
+                         'than a multiple of the interquartile range. mad: distance from the median in robust '
+                         'standard deviations (1.4826 x median absolute deviation).'
                 )
+                if options['outlier_method'] == 'iqr':
+                    options['iqr_multiplier'] = st.slider(
+                        'IQR multiplier for outliers',
+                        0.5, 5.0, self.scruff_defaults.IQR_MULTIPLIER, 0.1
+                    )
+                else:
+                    options['z_score_threshold'] = st.slider(
+                        'Z-score threshold for outliers',
+                        1.0, 5.0, self.scruff_defaults.Z_SCORE_THRESHOLD, 0.1
+                    )
+            options['numeric_engine'] = st.selectbox(
+                'Numeric engine',
+                options=['sequential', 'matrix'],
+                index=['sequential', 'matrix'].index(self.scruff_defaults.NUMERIC_ENGINE),
+                help='sequential processes columns one at a time, each filtering the rows the next one sees; '
+                     'matrix processes all numeric columns at once in this process and removes outliers with one '
+                     'combined mask, so it can keep rows that sequential drops.'
+            )
             options['fill_numeric_na'] = st.checkbox(
                 'Fill Numeric NA Values',
                 value=self.scruff_defaults.NUMERIC_OPTIONS['fill_numeric_na']
@@ -1,6 +1,5 @@
 import streamlit as st
-import io
-import zipfile
+from version_control.store import VersionStore
 
 class VersionController:
     def load_from_session(self):
@@ -9,9 +8,13 @@ class VersionController:
         if 'selected_upload' not in st.session_state:
             st.session_state['selected_upload'] = None
         if 'dataframe_versions' not in st.session_state:
-            st.session_state['dataframe_versions'] = {}
+            st.session_state['dataframe_versions'] = VersionStore()
         if 'selected_version' not in st.session_state:
             st.session_state['selected_version'] = None
+        if 'undo_stack' not in st.session_state:
+            st.session_state['undo_stack'] = []
+        if 'redo_stack' not in st.session_state:
+            st.session_state['redo_stack'] = []
 
     def add_uploaded_file(self, name, df):
         base_name = name.rsplit('.', 1)[0]
@@ -50,30 +53,86 @@ class VersionController:
     def set_selected_version(self, version):
         st.session_state['selected_version'] = version
         if 'df' in st.session_state and version in self.get_dataframes():
-            st.session_state['df'] = self.get_dataframes()[version].copy(deep=True)
+            st.session_state['df'] = self.get_dataframes()[version]
 
-    def add_version(self, name, df, upload_name=None):
+    def add_version(self, name, df, upload_name=None, rerun=True, parent=None, command=None):
         if upload_name is None:
             upload_name = st.session_state['selected_upload']
         base_name = st.session_state['uploaded_files'][upload_name]
         if not name.startswith(f'{base_name}'):
             name = f'{base_name}_{name}'
-        st.session_state['dataframe_versions'][name] = df
+        versions = st.session_state['dataframe_versions']
+        previous_node, previous_selected = versions.node(name), self.get_selected_version()
+        versions.add(name, df, parent=parent, command=command)
+        st.session_state['undo_stack'].append({
+            'name': name,
+            'previous': previous_node,
+            'node': versions.node(name),
+            'selected': previous_selected
+        })
+        st.session_state['redo_stack'] = []
         self.set_selected_version(name)
-        st.rerun()
+        if rerun:
+            st.rerun()
+
+    def can_undo(self):
+        return bool(st.session_state['undo_stack'])
+
+    def can_redo(self):
+        return bool(st.session_state['redo_stack'])
+
+    def undo(self):
+        if not self.can_undo():
+            return False
+        step = st.session_state['undo_stack'].pop()
+        versions = st.session_state['dataframe_versions']
+        versions.restore(step['name'], step['previous'])
+        st.session_state['redo_stack'].append(step)
+        selected = step['selected'] if step['selected'] in versions else next(iter(versions), None)
+        self.set_selected_version(selected)
+        return True
+
+    def redo(self):
+        if not self.can_redo():
+            return False
+        step = st.session_state['redo_stack'].pop()
+        st.session_state['dataframe_versions'].restore(step['name'], step['node'])
+        st.session_state['undo_stack'].append(step)
+        self.set_selected_version(step['name'])
+        return True
 
-    def remove_versions(self, versions_to_remove, cannot_remove_message, last_version_message):
+    def clear_history(self):
+        st.session_state['undo_stack'] = []
+        st.session_state['redo_stack'] = []
+
+    def get_lineage(self, version=None):
+        if version is None:
+            version = self.get_selected_version()
+        return st.session_state['dataframe_versions'].lineage(version)
+
+    def _history_nodes(self):
+        steps = st.session_state['undo_stack'] + st.session_state['redo_stack']
+        return [node for step in steps for node in (step['previous'], step['node']) if node is not None]
+
+    def remove_versions(self, versions_to_remove, cannot_remove_message, last_version_message, rerun=True):
         versions = self.get_versions_for_upload()
         if len(versions) > 1:
             original_version = versions[0]
+            store = st.session_state['dataframe_versions']
+            history = self._history_nodes()
             for version in versions_to_remove:
                 if version == original_version:
                     st.warning(cannot_remove_message)
                     return
-                del st.session_state['dataframe_versions'][version]
-            if st.session_state['selected_version'] not in st.session_state['dataframe_versions']:
+                # Undo and redo may bring back a node they reference, so its data is kept.
+                if any(node is store.node(version) for node in history):
+                    store.restore(version, None)
+                else:
+                    del store[version]
+            if st.session_state['selected_version'] not in store:
                 self.set_selected_version(original_version)
-            st.rerun()
+            if rerun:
+                st.rerun()
         else:
             st.warning(last_version_message)
 
@@ -82,18 +141,14 @@ class VersionController:
         selected_version = self.get_selected_version()
         if selected_version in self.get_dataframes():
             current_df = self.get_dataframes()[selected_version]
-            st.session_state['df'] = current_df.copy(deep=True)
+            st.session_state['df'] = current_df
             if 'scruffy' in st.session_state:
-                st.session_state['scruffy'].curr_df = current_df.copy(deep=True)
+                st.session_state['scruffy'].curr_df = current_df
 
-    def create_zip_of_all_versions(self):
-        zip_buffer = io.BytesIO()
-        versions = self.get_versions_for_upload()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for version in versions:
-                df = st.session_state['dataframe_versions'][version]
-                csv_buffer = io.StringIO()
-                df.to_csv(csv_buffer, index=False)
-                zip_file.writestr(version, csv_buffer.getvalue())
-        zip_buffer.seek(0)
-        return zip_buffer
\ No newline at end of file
+    def create_zip_of_all_versions(self, export_format='csv'):
+        from core import Exporter
+        return Exporter().export_zip(
+            self.get_versions_for_upload(),
+            st.session_state['dataframe_versions'].load,
+            export_format
+        )
@@ -0,0 +1,304 @@
+import itertools
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.config import CONFIG
+from core.cache import read_arrow, write_arrow
+from core.fingerprint import fingerprint_column, fingerprint_frame
+
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class VersionNode:
+    '''
+    One version in the lineage DAG.
+
+    A snapshot node owns its full frame (resident or spilled to path). A delta node points at its
+    parent node and records the row positions it keeps and, per output column, either the parent
+    column it reuses or the series it replaced it with. Children hold their parent node, so a
+    version that is overwritten or removed stays available to its descendants. A checkpointed
+    delta keeps its parent for lineage but owns its full frame like a snapshot.
+    '''
+    def __init__(self, name, parent=None, command=None, rows=None, columns=None, labels=None):
+        self.name = name
+        self.parent = parent
+        self.command = command
+        self.rows = rows
+        self.columns = columns
+        self.labels = labels
+        self.path = None
+        self.fingerprint = None
+        self.column_fingerprints = None
+        self.is_snapshot = parent is None
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = weakref.WeakSet()
+        if parent is not None:
+            parent.children.add(self)
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self.changed_columns = [] if columns is None else [
+            label for label, (source, _) in zip(labels, columns) if source == 'own'
+        ]
+        self.row_count = None if rows is None else len(rows)
+
+    @property
+    def kind(self):
+        if self.parent is None:
+            return 'snapshot'
+        if self.row_count is not None and self.changed_columns:
+            return 'rows+columns'
+        return 'rows' if self.row_count is not None else 'columns'
+
+    def checkpoint(self):
+        self.is_snapshot = True
+        self.depth = 0
+        self.rows = self.columns = self.labels = None
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'parent': self.parent.name if self.parent is not None else None,
+            'kind': self.kind,
+            'command': self.command,
+            'rows': self.row_count,
+            'changed_columns': [str(label) for label in self.changed_columns],
+            'created': self.created,
+            'checkpoint': self.is_snapshot and self.parent is not None,
+        }
+
+
+class VersionStore(MutableMapping):
+    '''
+    Ordered mapping of version names to DataFrames, stored as a lineage DAG.
+
+    A version added with a parent is kept as a delta against it when it is a row subset of the
+    parent, a rewrite of some of its columns, or both; anything else is stored whole, like a
+    checkpoint, and keeps its parent for lineage. A version that is overwritten keeps its data,
+    spilled if needed, so undo can restore it. Frames are materialized on demand and cached in
+    an LRU of at most max_resident frames (0 keeps everything). Evicted snapshots are spilled to
+    Arrow IPC files under spill_dir and memory-mapped back when read, evicted deltas are rebuilt
+    from their parent, and snapshots Arrow cannot represent stay resident. A delta more than
+    checkpoint_every steps away from the nearest snapshot is checkpointed, which bounds the cost
+    of rebuilding any version.
+
+    Relies on pandas copy-on-write (enabled in app.py): frames are stored and returned as shallow
+    copies, so a caller modifying a returned frame never touches the stored version, and columns a
+    delta reuses are shared with its parent.
+    '''
+    def __init__(self, versions=None, max_resident=None, spill_dir=None, checkpoint_every=None):
+        self.max_resident = CONFIG['versions'].MAX_RESIDENT if max_resident is None else max_resident
+        self.spill_dir = spill_dir or CONFIG['versions'].SPILL_DIR
+        self.checkpoint_every = (
+            CONFIG['versions'].CHECKPOINT_EVERY if checkpoint_every is None else checkpoint_every
+        )
+        self._nodes = {}
+        self._resident = OrderedDict()
+        self._dir = None
+        self._file_ids = itertools.count()
+        if versions:
+            self.update(versions)
+
+    def __getitem__(self, name):
+        return self._materialize(self._nodes[name]).copy(deep=False)
+
+    def __setitem__(self, name, df):
+        self.add(name, df)
+
+    def __delitem__(self, name):
+        self._release(self._nodes.pop(name))
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self._nodes)})'
+
+    def add(self, name, df, parent=None, command=None):
+        df = df.copy(deep=False)
+        parent_node = self._nodes.get(parent) if parent is not None else None
+        node = self._encode_delta(name, df, parent_node, command) if parent_node is not None else None
+        if node is None:
+            node = VersionNode(name, parent=parent_node, command=command)
+            if parent_node is not None:
+                node.changed_columns = list(df.columns)
+                node.checkpoint()
+            df = self._share_columns(df)
+        elif 0 < self.checkpoint_every <= node.depth:
+            node.checkpoint()
+        old_node = self._nodes.pop(name, None)
+        if old_node is not None:
+            self._release(old_node, keep_data=True)
+        self._nodes[name] = node
+        self._cache(node, df)
+
+    def node(self, name):
+        return self._nodes.get(name)
+
+    def restore(self, name, node):
+        '''Points name back at an earlier node, or removes it when node is None, keeping the
+        detached node's data so the change can be redone.'''
+        old_node = self._nodes.pop(name, None) if node is None else self._nodes.get(name)
+        if node is not None:
+            self._nodes[name] = node
+        if old_node is not None and old_node is not node:
+            self._release(old_node, keep_data=True)
+
+    def load(self, name):
+        '''Reads a version without caching it or evicting others, e.g. for exports.'''
+        return self._materialize(self._nodes[name], cache=False).copy(deep=False)
+
+    def fingerprint(self, name):
+        '''Content fingerprint of a version, computed once per node since nodes never change.'''
+        node = self._nodes[name]
+        if node.fingerprint is None:
+            column_fingerprints = self.column_fingerprints(name)
+            node.fingerprint = fingerprint_frame(self._materialize(node), column_fingerprints)
+        return node.fingerprint
+
+    def column_fingerprints(self, name):
+        '''
+        Fingerprint of each column of a version. A column delta reuses its parent's fingerprints
+        for the columns it kept, if the parent has been fingerprinted.
+        '''
+        node = self._nodes[name]
+        if node.column_fingerprints is None:
+            reused = {}
+            parent = node.parent
+            if not node.is_snapshot and node.rows is None and parent.column_fingerprints is not None:
+                parent_labels = self._materialize(parent).columns
+                if parent_labels.is_unique:
+                    reused = dict(zip(parent_labels, parent.column_fingerprints))
+            df = self._materialize(node)
+            columns = node.columns if not node.is_snapshot else [('own', None)] * len(df.columns)
+            node.column_fingerprints = [
+                reused[value] if source == 'parent' and value in reused else fingerprint_column(df.iloc[:, position])
+                for position, (source, value) in enumerate(columns)
+            ]
+        return node.column_fingerprints
+
+    def is_resident(self, name):
+        return self._nodes[name] in self._resident
+
+    def lineage(self, name):
+        '''Describes each version from the root snapshot down to name.'''
+        node, chain = self._nodes[name], []
+        while node is not None:
+            chain.append(node.describe())
+            node = node.parent
+        return chain[::-1]
+
+    @staticmethod
+    def _same_values(series, other):
+        if series.dtype != other.dtype:
+            return False
+        if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            return series.equals(other)
+        values, other_values = series.to_numpy(), other.to_numpy()
+        same_buffer = values.__array_interface__['data'][0] == other_values.__array_interface__['data'][0]
+        return same_buffer and values.strides == other_values.strides or series.equals(other)
+
+    def _share_columns(self, df):
+        if not df.columns.is_unique:
+            return df
+        candidates = [
+            other for other in reversed(self._resident.values())
+            if other.columns.is_unique and len(other) == len(df) and other.index.equals(df.index)
+        ]
+        for position, column in enumerate(df.columns):
+            other = next((other for other in candidates if column in other.columns), None)
+            if other is not None and self._same_values(df[column], other[column]):
+                df.isetitem(position, other[column])
+        return df
+
+    def _encode_delta(self, name, df, parent_node, command):
+        parent_df = self._materialize(parent_node)
+        if (
+            not len(df.columns) or not df.columns.is_unique or not parent_df.columns.is_unique
+            or df.index.names != parent_df.index.names
+        ):
+            return None
+        rows = None
+        if not df.index.equals(parent_df.index):
+            if not parent_df.index.is_unique or len(df) > len(parent_df):
+                return None
+            rows = parent_df.index.get_indexer(df.index)
+            if (rows < 0).any():
+                return None
+            rows = rows.astype(np.int32 if len(parent_df) < 2 ** 31 else np.int64)
+        base_df = parent_df if rows is None else parent_df.iloc[rows]
+        columns = []
+        for position, label in enumerate(df.columns):
+            series = df.iloc[:, position]
+            candidates = [label] if label in base_df.columns else []
+            if position < len(base_df.columns) and base_df.columns[position] != label:
+                candidates.append(base_df.columns[position])
+            source = next(
+                (candidate for candidate in candidates if self._same_values(series, base_df[candidate])),
+                None
+            )
+            columns.append(('parent', source) if source is not None else ('own', series))
+        if rows is None and all(kind == 'own' for kind, _ in columns):
+            return None
+        return VersionNode(name, parent=parent_node, command=command, rows=rows, columns=columns, labels=df.columns)
+
+    def _materialize(self, node, cache=True):
+        if node in self._resident:
+            self._resident.move_to_end(node)
+            return self._resident[node]
+        if node.is_snapshot:
+            df = read_arrow(node.path)
+        else:
+            parent_df = self._materialize(node.parent, cache)
+            base_df = parent_df if node.rows is None else parent_df.iloc[node.rows]
+            series = [
+                base_df[value] if source == 'parent' else value.set_axis(base_df.index)
+                for source, value in node.columns
+            ]
+            df = pd.concat(series, axis=1)
+            df.columns = node.labels
+        if cache:
+            self._cache(node, df)
+        return df
+
+    def _release(self, node, keep_data=False):
+        if node in self._resident and node.is_snapshot and node.path is None and (keep_data or len(node.children)):
+            if not self._spill(node):
+                return
+        self._resident.pop(node, None)
+
+    def _cache(self, node, df):
+        self._resident[node] = df
+        self._resident.move_to_end(node)
+        if self.max_resident <= 0:
+            return
+        for cached_node in list(self._resident)[:-1]:
+            if len(self._resident) <= self.max_resident:
+                break
+            if not cached_node.is_snapshot or cached_node.path is not None or self._spill(cached_node):
+                del self._resident[cached_node]
+
+    def _spill(self, node):
+        if self._dir is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._dir = tempfile.mkdtemp(prefix='versions_', dir=self.spill_dir)
+            weakref.finalize(self, shutil.rmtree, self._dir, True)
+        path = os.path.join(self._dir, f'{next(self._file_ids)}.arrow')
+        if not write_arrow(self._resident[node], path):
+            return False
+        node.path = path
+        weakref.finalize(node, _remove_file, path)
+        return True